@@ -0,0 +1,74 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+# Run with: bench --site <site> execute crm_dashboards.crm_dashboards.benchmarks.<function>
+
+import time
+
+import frappe
+import numpy as np
+from frappe.utils import add_days, getdate, today
+
+from crm_dashboards.crm_dashboards.doctype.sales_visit_log.sales_visit_log import INDEXES
+from crm_dashboards.crm_dashboards.rfm import score_customers
+
+
+def benchmark_rfm(customers=100000, seed=42):
+	"""Score a synthetic customer base in memory and report the timing"""
+	customers = int(customers)
+	rng = np.random.default_rng(int(seed))
+	as_of = getdate(today())
+
+	last_dates = np.datetime64(add_days(as_of, -1095), "D") + rng.integers(0, 1096, customers)
+	frequency = rng.geometric(0.3, customers).astype(float)
+	monetary = rng.lognormal(10, 1.5, customers)
+
+	start = time.perf_counter()
+	scores = score_customers(last_dates, frequency, monetary, as_of)
+	elapsed = time.perf_counter() - start
+
+	segments, counts = np.unique(scores["segment"], return_counts=True)
+	result = {
+		"customers": customers,
+		"seconds": round(elapsed, 3),
+		"segments": dict(zip(segments.tolist(), counts.tolist(), strict=True)),
+	}
+	return result
+
+
+def benchmark_sales_visit_log_plan(days=30, runs=20):
+	"""EXPLAIN and time the Daily Sales Report listing query with and without the composite indexes"""
+	values = {"from_date": add_days(today(), -int(days)), "to_date": today()}
+	query = """
+		SELECT svl.date_of_visit, svl.sales_person, svl.customer, svl.estimated_order_value
+		FROM `tabSales Visit Log` svl {index_hint}
+		WHERE svl.docstatus = 1
+		AND svl.date_of_visit >= %(from_date)s
+		AND svl.date_of_visit <= %(to_date)s
+		ORDER BY svl.date_of_visit DESC, svl.sales_person
+	"""
+
+	existing = {row.Key_name for row in frappe.db.sql("SHOW INDEX FROM `tabSales Visit Log`", as_dict=True)}
+	ignored = [index_name for index_name in INDEXES if index_name in existing]
+
+	result = {"rows": frappe.db.count("Sales Visit Log")}
+	for label, index_hint in (
+		("without_indexes", "IGNORE INDEX ({})".format(", ".join(ignored)) if ignored else ""),
+		("with_indexes", ""),
+	):
+		sql = query.format(index_hint=index_hint)
+		plan = frappe.db.sql("EXPLAIN " + sql, values, as_dict=True)
+
+		start = time.perf_counter()
+		for _run in range(int(runs)):
+			frappe.db.sql(sql, values)
+		elapsed = time.perf_counter() - start
+
+		result[label] = {
+			"plan": [
+				{"type": row.type, "key": row.key, "rows": row.rows, "extra": row.Extra} for row in plan
+			],
+			"ms_per_query": round(elapsed * 1000 / int(runs), 2),
+		}
+
+	return result
@@ -0,0 +1,87 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.desk.query_report import get_report_doc, run
+
+REPORT_METHOD = "frappe.desk.query_report.run"
+
+
+@frappe.whitelist()
+def get_dashboard_payloads(dashboard_name):
+	"""First-paint data for every Report chart and Custom number card on a dashboard, each
+	distinct report run or card method call computed once. Entries carry the method and
+	arguments the widget would call with, public/js/dashboard_view.js matches them up"""
+	frappe.has_permission("Dashboard", "read", dashboard_name, throw=True)
+	dashboard = frappe.get_cached_doc("Dashboard", dashboard_name)
+
+	payloads = {}
+	roles = set(frappe.get_roles())
+
+	for row in dashboard.charts:
+		chart = frappe.get_cached_doc("Dashboard Chart", row.chart)
+		if chart.chart_type != "Report" or not chart.report_name or not is_allowed(chart, roles):
+			continue
+
+		if not can_run_report(chart.report_name):
+			continue
+
+		args = {"report_name": chart.report_name, "filters": parse_filters(chart.filters_json)}
+		add_payload(
+			payloads,
+			REPORT_METHOD,
+			args,
+			lambda: run(chart.report_name, args["filters"], ignore_prepared_report=True),
+		)
+
+	for row in dashboard.cards:
+		card = frappe.get_cached_doc("Number Card", row.card)
+		if card.type != "Custom" or not card.method or not is_allowed(card, roles):
+			continue
+
+		method = frappe.get_attr(card.method)
+		frappe.is_whitelisted(method)
+
+		args = {"filters": parse_filters(card.filters_json)}
+		add_payload(payloads, card.method, args, lambda: method(filters=args["filters"]))
+
+	return list(payloads.values())
+
+
+def is_allowed(widget, roles):
+	"""A widget with roles set is only shown to users holding one of them"""
+	widget_roles = {row.role for row in widget.get("roles") or []}
+	return not widget_roles or bool(widget_roles & roles)
+
+
+def can_run_report(report_name):
+	"""Skip charts the desk would refuse to run, instead of failing the whole batch"""
+	try:
+		report = get_report_doc(report_name)
+	except (frappe.PermissionError, frappe.DoesNotExistError):
+		frappe.clear_messages()
+		return False
+
+	return not report.ref_doctype or frappe.has_permission(report.ref_doctype, "report")
+
+
+def add_payload(payloads, method, args, compute):
+	"""A widget that fails is left out of the batch, the client loads it on its own and shows
+	its error there"""
+	key = (method, json.dumps(args, sort_keys=True, default=str))
+	if key in payloads:
+		return
+
+	try:
+		result = compute()
+	except Exception:
+		frappe.clear_messages()
+		return
+
+	payloads[key] = {"method": method, "args": args, "result": result}
+
+
+def parse_filters(filters_json):
+	return frappe.parse_json(filters_json or "{}") or {}
@@ -0,0 +1,87 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+# Relative date windows for chart and card filters. A filter of {"date_window": "Last 30 Days"}
+# is resolved on the server to the same canonical from_date and to_date for everyone opening
+# the dashboard that day, so the result can be cached and shared.
+
+import frappe
+from erpnext.accounts.utils import get_fiscal_year
+from frappe import _
+from frappe.utils import add_days, add_months, get_first_day, get_quarter_start, getdate, today
+
+DATE_WINDOW_FIELD = "date_window"
+
+
+def get_last_days(days):
+	def resolve(date):
+		return {"from_date": add_days(date, -days + 1), "to_date": date}
+
+	return resolve
+
+
+def get_last_months(months):
+	def resolve(date):
+		return {"from_date": add_days(add_months(date, -months), 1), "to_date": date}
+
+	return resolve
+
+
+def get_month_to_date(date):
+	return {"from_date": get_first_day(date), "to_date": date, "month": date}
+
+
+def get_last_month(date):
+	month_end = add_days(get_first_day(date), -1)
+	return {"from_date": get_first_day(month_end), "to_date": month_end, "month": month_end}
+
+
+def get_quarter_to_date(date):
+	return {"from_date": get_quarter_start(date), "to_date": date}
+
+
+def get_year_to_date(date):
+	return {"from_date": getdate(date).replace(month=1, day=1), "to_date": date}
+
+
+def get_current_fiscal_year(date):
+	fiscal_year, year_start_date, year_end_date = get_fiscal_year(date)[:3]
+	return {"from_date": year_start_date, "to_date": year_end_date, "fiscal_year": fiscal_year}
+
+
+# Window name: filter values for the window ending on a date. Month windows also set the
+# Monthly Sales Report's month, fiscal year windows the Sales Budget's fiscal_year.
+DATE_WINDOWS = {
+	"Last 7 Days": get_last_days(7),
+	"Last 30 Days": get_last_days(30),
+	"Last 90 Days": get_last_days(90),
+	"Last 6 Months": get_last_months(6),
+	"Last 12 Months": get_last_months(12),
+	"Month to Date": get_month_to_date,
+	"Last Month": get_last_month,
+	"Quarter to Date": get_quarter_to_date,
+	"Year to Date": get_year_to_date,
+	"Current Fiscal Year": get_current_fiscal_year,
+}
+
+
+def resolve_date_window(filters, date=None):
+	"""Filters with a date_window replaced by the dates it stands for on the given day (today).
+	Filters without one are returned unchanged"""
+	if not has_date_window(filters):
+		return filters
+
+	resolved = frappe._dict(frappe.parse_json(filters))
+	window = resolved.pop(DATE_WINDOW_FIELD)
+	if window not in DATE_WINDOWS:
+		frappe.throw(_("Unknown date window {0}").format(window))
+
+	resolved.update(DATE_WINDOWS[window](getdate(date or today())))
+	return resolved
+
+
+def has_date_window(filters):
+	if isinstance(filters, str):
+		filters = frappe.parse_json(filters)
+
+	return bool(isinstance(filters, dict) and filters.get(DATE_WINDOW_FIELD))
@@ -0,0 +1,140 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now, today
+
+from crm_dashboards.crm_dashboards.report_cache import invalidate_doctype
+
+SNAPSHOT_FIELDS = ("sales_stage", "opportunity_owner", "amount", "probability", "expected_closing", "status")
+
+# Written once when an opportunity that was in the last snapshot is deleted or cancelled
+REMOVED_STATUS = "Removed"
+
+
+class OpportunityPipelineSnapshot(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Opportunity Pipeline Snapshot", ["opportunity", "snapshot_date"])
+
+
+def take_snapshot(snapshot_date=None):
+	"""Store today's state of every opportunity that changed since its previous snapshot"""
+	snapshot_date = getdate(snapshot_date or today())
+
+	# Re-running on the same day replaces that day's rows instead of stacking duplicates
+	frappe.db.delete("Opportunity Pipeline Snapshot", {"snapshot_date": snapshot_date})
+
+	previous = get_pipeline_state(snapshot_date, before=True)
+	current = {
+		row.opportunity: row
+		for row in frappe.db.sql(
+			"""
+			SELECT
+				opp.name as opportunity,
+				opp.sales_stage,
+				opp.opportunity_owner,
+				opp.base_opportunity_amount as amount,
+				opp.probability,
+				opp.expected_closing,
+				opp.status
+			FROM `tabOpportunity` opp
+			WHERE opp.docstatus != 2
+		""",
+			as_dict=True,
+		)
+	}
+
+	changed = [
+		row for name, row in current.items() if get_signature(row) != get_signature(previous.get(name))
+	]
+	changed.extend(
+		frappe._dict(row, status=REMOVED_STATUS)
+		for name, row in previous.items()
+		if name not in current and row.status != REMOVED_STATUS
+	)
+
+	if changed:
+		save_snapshot_rows(changed, snapshot_date)
+		invalidate_doctype("Opportunity Pipeline Snapshot")
+
+	return len(changed)
+
+
+def get_signature(row):
+	if not row:
+		return None
+
+	return (
+		row.sales_stage,
+		row.opportunity_owner,
+		flt(row.amount, 2),
+		flt(row.probability, 2),
+		str(getdate(row.expected_closing)) if row.expected_closing else None,
+		row.status,
+	)
+
+
+def get_pipeline_state(as_of, before=False, opportunity_owner=None):
+	"""Latest snapshot row per opportunity on (or strictly before) a date"""
+	values = {"as_of": getdate(as_of), "opportunity_owner": opportunity_owner}
+	owner_condition = "AND s.opportunity_owner = %(opportunity_owner)s" if opportunity_owner else ""
+
+	rows = frappe.db.sql(
+		"""
+		SELECT s.opportunity, {fields}
+		FROM `tabOpportunity Pipeline Snapshot` s
+		INNER JOIN (
+			SELECT opportunity, MAX(snapshot_date) as snapshot_date
+			FROM `tabOpportunity Pipeline Snapshot`
+			WHERE snapshot_date {operator} %(as_of)s
+			GROUP BY opportunity
+		) latest ON latest.opportunity = s.opportunity AND latest.snapshot_date = s.snapshot_date
+		WHERE 1 = 1 {owner_condition}
+	""".format(
+			fields=", ".join("s." + field for field in SNAPSHOT_FIELDS),
+			operator="<" if before else "<=",
+			owner_condition=owner_condition,
+		),
+		values,
+		as_dict=True,
+	)
+
+	return {row.opportunity: row for row in rows}
+
+
+def save_snapshot_rows(rows, snapshot_date):
+	timestamp = now()
+	user = frappe.session.user
+
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"modified_by",
+		"owner",
+		"docstatus",
+		"snapshot_date",
+		"opportunity",
+	]
+	fields.extend(SNAPSHOT_FIELDS)
+
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			user,
+			user,
+			0,
+			snapshot_date,
+			row.opportunity,
+			*(row.get(field) for field in SNAPSHOT_FIELDS),
+		)
+		for row in rows
+	]
+
+	frappe.db.bulk_insert("Opportunity Pipeline Snapshot", fields, values)
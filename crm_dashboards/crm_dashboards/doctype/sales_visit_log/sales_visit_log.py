@@ -1,9 +1,22 @@
 # Copyright (c) 2025, Meghwin Dave and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
+# Report queries filter on docstatus and a date range, then by sales person or customer
+INDEXES = {
+	"docstatus_date_of_visit_sales_person_index": ["docstatus", "date_of_visit", "sales_person"],
+	"customer_date_of_visit_index": ["customer", "date_of_visit"],
+	"sales_person_date_of_visit_index": ["sales_person", "date_of_visit"],
+}
+
 
 class SalesVisitLog(Document):
 	pass
+
+
+def on_doctype_update():
+	# add_index skips indexes that already exist, so this is safe on every migrate
+	for index_name, fields in INDEXES.items():
+		frappe.db.add_index("Sales Visit Log", fields, index_name)
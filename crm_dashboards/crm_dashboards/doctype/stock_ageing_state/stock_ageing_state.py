@@ -0,0 +1,320 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import json
+from collections import defaultdict
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_to_date, cstr, flt, get_datetime, now, now_datetime
+
+from crm_dashboards.crm_dashboards.report_cache import invalidate_doctype
+
+WATERMARK_KEY = "crm_dashboards_stock_ageing_watermark"
+
+# Entries created in the last few minutes may belong to transactions that have not committed
+# yet, so the watermark stays this far behind the clock
+SETTLE_MINUTES = 10
+
+ITEM_BATCH_SIZE = 500
+QTY_PRECISION = 6
+
+LEDGER_FIELDS = """
+	sle.item_code,
+	sle.warehouse,
+	sle.company,
+	sle.actual_qty,
+	sle.qty_after_transaction,
+	sle.voucher_type,
+	sle.is_cancelled,
+	sle.posting_date,
+	TIMESTAMP(sle.posting_date, sle.posting_time) as posting_datetime
+"""
+
+
+class StockAgeingState(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Ageing State", ["item_code", "warehouse"])
+
+
+def update_ageing_state():
+	"""Scheduler job: replay the Stock Ledger Entries created since the watermark onto the saved
+	FIFO queues. An item-warehouse whose new entries include a cancellation, or are dated before
+	its last replayed entry, is rebuilt from its full history instead, as is one whose saved qty
+	has drifted from its Bin"""
+	watermark = frappe.db.get_global(WATERMARK_KEY)
+	if not watermark:
+		return rebuild_ageing_state()
+
+	upto = get_settled_time()
+	entries = frappe.db.sql(
+		f"""
+		SELECT {LEDGER_FIELDS}
+		FROM `tabStock Ledger Entry` sle
+		WHERE sle.creation > %(watermark)s
+		AND sle.creation <= %(upto)s
+		ORDER BY posting_datetime, sle.creation
+	""",
+		{"watermark": watermark, "upto": upto},
+		as_dict=True,
+	)
+
+	new_entries = defaultdict(list)
+	for entry in entries:
+		new_entries[(entry.item_code, entry.warehouse)].append(entry)
+
+	states = get_saved_states(new_entries)
+	rebuild, updated = [], {}
+
+	for key, rows in new_entries.items():
+		state = states.get(key)
+		if any(row.is_cancelled for row in rows) or (
+			state and state.last_posting and rows[0].posting_datetime < get_datetime(state.last_posting)
+		):
+			rebuild.append(key)
+			continue
+
+		state = state or get_new_state(rows[0])
+		for row in rows:
+			apply_entry(state, row)
+		updated[key] = state
+
+	# Entries whose transaction committed after the settle window are behind the watermark
+	# already; their item-warehouses show up as a saved qty that no longer matches the Bin
+	rebuild.extend(key for key in get_drifted_keys(upto) if key not in new_entries)
+	updated.update(replay_history(rebuild, upto=upto))
+	save_states(updated)
+
+	frappe.db.set_global(WATERMARK_KEY, cstr(upto))
+	if updated:
+		invalidate_doctype("Stock Ageing State")
+
+	return len(updated)
+
+
+def rebuild_ageing_state():
+	"""Replay the whole ledger, a batch of items at a time, and set the watermark"""
+	upto = get_settled_time()
+	frappe.db.delete("Stock Ageing State")
+
+	items = frappe.db.sql_list(
+		"SELECT DISTINCT item_code FROM `tabStock Ledger Entry` WHERE is_cancelled = 0"
+	)
+	for start in range(0, len(items), ITEM_BATCH_SIZE):
+		states = replay_history(items=items[start : start + ITEM_BATCH_SIZE], upto=upto)
+		save_states(states)
+		frappe.db.commit()
+
+	frappe.db.set_global(WATERMARK_KEY, cstr(upto))
+	invalidate_doctype("Stock Ageing State")
+	return len(items)
+
+
+def get_drifted_keys(upto):
+	"""Item-warehouses whose Bin qty differs from the saved state, leaving out those with
+	entries after upto, whose difference is just not replayed yet"""
+	return [
+		(item_code, warehouse)
+		for item_code, warehouse in frappe.db.sql(
+			"""
+			SELECT bin.item_code, bin.warehouse
+			FROM `tabBin` bin
+			LEFT JOIN `tabStock Ageing State` state
+				ON state.item_code = bin.item_code AND state.warehouse = bin.warehouse
+			WHERE ROUND(bin.actual_qty, 6) != ROUND(IFNULL(state.qty, 0), 6)
+			AND NOT EXISTS (
+				SELECT 1
+				FROM `tabStock Ledger Entry` sle
+				WHERE sle.item_code = bin.item_code
+				AND sle.warehouse = bin.warehouse
+				AND sle.creation > %(upto)s
+			)
+		""",
+			{"upto": upto},
+		)
+	]
+
+
+def replay_history(keys=None, items=None, upto=None):
+	"""FIFO state from every live ledger entry of the given item-warehouses, or of all
+	warehouses of the given items"""
+	if keys:
+		items = list({item_code for item_code, _warehouse in keys})
+	if not items:
+		return {}
+
+	entries = frappe.db.sql(
+		"""
+		SELECT {fields}
+		FROM `tabStock Ledger Entry` sle
+		WHERE sle.item_code IN %(items)s
+		AND sle.is_cancelled = 0
+		{upto_condition}
+		ORDER BY posting_datetime, sle.creation
+	""".format(fields=LEDGER_FIELDS, upto_condition="AND sle.creation <= %(upto)s" if upto else ""),
+		{"items": items, "upto": upto},
+		as_dict=True,
+	)
+
+	wanted = set(keys) if keys else None
+	states = {}
+	for entry in entries:
+		key = (entry.item_code, entry.warehouse)
+		if wanted is not None and key not in wanted:
+			continue
+
+		if key not in states:
+			states[key] = get_new_state(entry)
+		apply_entry(states[key], entry)
+
+	# Pairs whose only entries were cancelled are left with an empty queue
+	for key in wanted or ():
+		states.setdefault(
+			key,
+			frappe._dict(
+				item_code=key[0], warehouse=key[1], company=None, qty=0, last_posting=None, queue=[]
+			),
+		)
+
+	return states
+
+
+def apply_entry(state, entry):
+	qty = flt(entry.actual_qty)
+	if entry.voucher_type == "Stock Reconciliation":
+		# Reconciliations state the new balance, the movement is the difference
+		qty = flt(entry.qty_after_transaction) - state.qty
+
+	posting_date = cstr(entry.posting_date)
+	if qty > 0:
+		add_stock(state.queue, qty, posting_date)
+	elif qty < 0:
+		remove_stock(state.queue, -qty, posting_date)
+
+	state.qty = flt(state.qty + qty, QTY_PRECISION)
+	state.last_posting = entry.posting_datetime
+	state.company = state.company or entry.company
+
+
+def add_stock(queue, qty, posting_date):
+	if queue and queue[-1][0] < 0:
+		# Stock was negative, the receipt first covers the shortfall
+		qty = flt(qty + queue.pop()[0], QTY_PRECISION)
+		if qty <= 0:
+			if qty:
+				queue.append([qty, posting_date])
+			return
+
+	queue.append([qty, posting_date])
+
+
+def remove_stock(queue, qty, posting_date):
+	"""Consume the oldest buckets first; what is left over becomes a negative bucket"""
+	while qty > 0 and queue and queue[0][0] > 0:
+		if queue[0][0] > qty:
+			queue[0][0] = flt(queue[0][0] - qty, QTY_PRECISION)
+			qty = 0
+		else:
+			qty = flt(qty - queue.pop(0)[0], QTY_PRECISION)
+
+	if qty > 0:
+		if queue:
+			queue[-1][0] = flt(queue[-1][0] - qty, QTY_PRECISION)
+		else:
+			queue.append([-qty, posting_date])
+
+
+def get_new_state(entry):
+	return frappe._dict(
+		item_code=entry.item_code,
+		warehouse=entry.warehouse,
+		company=entry.company,
+		qty=0,
+		last_posting=None,
+		queue=[],
+	)
+
+
+def get_saved_states(keys):
+	if not keys:
+		return {}
+
+	rows = frappe.db.sql(
+		"""
+		SELECT item_code, warehouse, company, qty, last_posting, fifo_queue
+		FROM `tabStock Ageing State`
+		WHERE item_code IN %(items)s
+	""",
+		{"items": list({item_code for item_code, _warehouse in keys})},
+		as_dict=True,
+	)
+
+	return {
+		(row.item_code, row.warehouse): frappe._dict(
+			row, qty=flt(row.qty), queue=json.loads(row.fifo_queue or "[]")
+		)
+		for row in rows
+		if (row.item_code, row.warehouse) in keys
+	}
+
+
+def save_states(states):
+	if not states:
+		return
+
+	# Replace the rows one item batch at a time
+	keys = list(states)
+	for start in range(0, len(keys), ITEM_BATCH_SIZE):
+		batch = keys[start : start + ITEM_BATCH_SIZE]
+		frappe.db.sql(
+			"""
+			DELETE FROM `tabStock Ageing State`
+			WHERE (item_code, warehouse) IN %(keys)s
+		""",
+			{"keys": batch},
+		)
+
+	timestamp = now()
+	user = frappe.session.user
+
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"modified_by",
+		"owner",
+		"docstatus",
+		"item_code",
+		"warehouse",
+		"company",
+		"qty",
+		"last_posting",
+		"fifo_queue",
+	]
+
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			user,
+			user,
+			0,
+			state.item_code,
+			state.warehouse,
+			state.company,
+			state.qty,
+			state.last_posting,
+			json.dumps(state.queue, separators=(",", ":")),
+		)
+		for state in states.values()
+	]
+
+	frappe.db.bulk_insert("Stock Ageing State", fields, values)
+
+
+def get_settled_time():
+	return add_to_date(now_datetime(), minutes=-SETTLE_MINUTES)
@@ -0,0 +1,99 @@
+# Copyright (c) 2025, Meghwin Dave and Contributors
+# See license.txt
+
+import json
+from unittest.mock import patch
+
+import frappe
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.doctype.warehouse.test_warehouse import create_warehouse
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_to_date, cstr, now_datetime, today
+
+from crm_dashboards.crm_dashboards.doctype.stock_ageing_state.stock_ageing_state import (
+	WATERMARK_KEY,
+	add_stock,
+	apply_entry,
+	get_new_state,
+	remove_stock,
+	update_ageing_state,
+)
+
+COMPANY = "_Test Company"
+
+
+def get_entry(actual_qty=0, posting_date="2025-01-01", voucher_type="Stock Entry", **kwargs):
+	return frappe._dict(
+		item_code="_Test Item",
+		warehouse="_Test Warehouse - _TC",
+		company=COMPANY,
+		actual_qty=actual_qty,
+		posting_date=posting_date,
+		posting_datetime=posting_date + " 10:00:00",
+		voucher_type=voucher_type,
+		**kwargs,
+	)
+
+
+class TestStockAgeingState(FrappeTestCase):
+	def test_remove_stock_consumes_oldest_first(self):
+		queue = [[10, "2025-01-01"], [5, "2025-02-01"]]
+		remove_stock(queue, 12, "2025-03-01")
+		self.assertEqual(queue, [[3, "2025-02-01"]])
+
+	def test_negative_stock(self):
+		queue = [[3, "2025-01-01"]]
+		remove_stock(queue, 5, "2025-02-01")
+		self.assertEqual(queue, [[-2, "2025-02-01"]])
+
+		# A receipt first covers the shortfall
+		add_stock(queue, 1, "2025-03-01")
+		self.assertEqual(queue, [[-1, "2025-03-01"]])
+
+		add_stock(queue, 4, "2025-04-01")
+		self.assertEqual(queue, [[3, "2025-04-01"]])
+
+	def test_reconciliation_up_and_down(self):
+		state = get_new_state(get_entry())
+		apply_entry(state, get_entry(10, "2025-01-01"))
+
+		# Reconciliations post actual_qty 0, the movement is the new balance less the old
+		apply_entry(state, get_entry(0, "2025-02-01", "Stock Reconciliation", qty_after_transaction=15))
+		self.assertEqual(state.qty, 15)
+		self.assertEqual(state.queue, [[10, "2025-01-01"], [5, "2025-02-01"]])
+
+		apply_entry(state, get_entry(0, "2025-03-01", "Stock Reconciliation", qty_after_transaction=8))
+		self.assertEqual(state.qty, 8)
+		self.assertEqual(state.queue, [[3, "2025-01-01"], [5, "2025-02-01"]])
+
+	def test_backdated_entry_rebuilds_queue(self):
+		item = make_item("_Test Stock Ageing State Item", {"is_stock_item": 1}).name
+		warehouse = create_warehouse("_Test Stock Ageing State Warehouse", company=COMPANY)
+		frappe.db.set_global(WATERMARK_KEY, cstr(add_to_date(now_datetime(), seconds=-1)))
+
+		# Entries count as settled straight away
+		settled = patch(
+			"crm_dashboards.crm_dashboards.doctype.stock_ageing_state.stock_ageing_state.get_settled_time",
+			side_effect=now_datetime,
+		)
+
+		with settled:
+			make_stock_entry(item_code=item, target=warehouse, qty=10, basic_rate=10)
+			update_ageing_state()
+
+			make_stock_entry(
+				item_code=item, target=warehouse, qty=5, basic_rate=10, posting_date=add_days(today(), -30)
+			)
+			update_ageing_state()
+
+		state = frappe.db.get_value(
+			"Stock Ageing State",
+			{"item_code": item, "warehouse": warehouse},
+			["qty", "fifo_queue"],
+			as_dict=True,
+		)
+
+		self.assertEqual(state.qty, 15)
+		# Replayed in posting order, not appended after the newer receipt
+		self.assertEqual(json.loads(state.fifo_queue), [[5, cstr(add_days(today(), -30))], [10, today()]])
@@ -0,0 +1,227 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cstr, getdate, now, today
+
+from crm_dashboards.crm_dashboards.report_cache import invalidate_doctype
+
+SUMMARY_FIELDS = ("entries", "in_qty", "in_value", "out_qty", "out_value")
+
+PENDING_KEY = "crm_dashboards:stock_movement_summary:pending"
+QUEUED_KEY = "crm_dashboards:stock_movement_summary:queued"
+# Bounds how long a job lost before it started holds back the next one
+QUEUED_TIMEOUT = 10 * 60
+
+
+class StockMovementSummary(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Movement Summary", ["company", "posting_date", "warehouse"])
+
+
+def enqueue_summary_update(doc, method=None):
+	"""Stock Ledger Entry on_submit: note the entry's day, the days a transaction touched are
+	queued for recompute once it commits. Cancelling a voucher posts reversing entries on the
+	same day, so that is covered too"""
+	days = frappe.flags.stock_movement_summary_days
+	if days is None:
+		days = frappe.flags.stock_movement_summary_days = set()
+		frappe.db.after_commit.add(queue_pending_days)
+		frappe.db.after_rollback.add(discard_pending_days)
+
+	days.add(json.dumps([doc.company, cstr(getdate(doc.posting_date))]))
+
+
+def queue_pending_days():
+	days = frappe.flags.pop("stock_movement_summary_days", None)
+	if not days:
+		return
+
+	cache = frappe.cache()
+	cache.sadd(cache.make_key(PENDING_KEY), *days)
+
+	# A queued job has not read the ledger yet and will pick these days up; once it has
+	# started, they need a job of their own
+	if cache.set(cache.make_key(QUEUED_KEY), 1, nx=True, ex=QUEUED_TIMEOUT):
+		frappe.enqueue(
+			"crm_dashboards.crm_dashboards.doctype.stock_movement_summary.stock_movement_summary.update_pending_days",
+			queue="short",
+		)
+
+
+def discard_pending_days():
+	frappe.flags.pop("stock_movement_summary_days", None)
+
+
+def update_pending_days():
+	"""Background job: recompute every day noted since the job was queued, committing each"""
+	cache = frappe.cache()
+	cache.delete(cache.make_key(QUEUED_KEY))
+	frappe.db.commit()
+
+	while True:
+		day = cache.spop(cache.make_key(PENDING_KEY))
+		if not day:
+			break
+
+		company, posting_date = json.loads(day)
+		try:
+			update_summary(company, posting_date)
+			frappe.db.commit()
+		except Exception:
+			frappe.db.rollback()
+			cache.sadd(cache.make_key(PENDING_KEY), day)
+			raise
+
+
+def update_summary(company, from_date, to_date=None):
+	"""Replace the company's summary rows for the days in the range with fresh totals from the
+	ledger. Movements are split the way the Stock Balance report does: a non-negative change
+	in quantity is in at its signed value, anything else is out at its absolute quantity and
+	value. A Stock Reconciliation states the new balance, so its change is measured against the
+	balance before it, and opening entries are neither in nor out"""
+	values = {"company": company, "from_date": getdate(from_date), "to_date": getdate(to_date or from_date)}
+
+	# Recomputes of the same company run one after another, each reading the ledger only once
+	# the one before it has committed
+	frappe.db.get_value("Company", company, "name", for_update=True)
+
+	rows = frappe.db.sql(
+		"""
+		SELECT
+			sle.posting_date,
+			sle.warehouse,
+			COUNT(*) as entries,
+			SUM(CASE WHEN sle.is_opening != 'Yes' AND sle.qty_diff >= 0 THEN sle.qty_diff ELSE 0 END) as in_qty,
+			SUM(CASE WHEN sle.is_opening != 'Yes' AND sle.qty_diff >= 0 THEN sle.stock_value_difference ELSE 0 END) as in_value,
+			SUM(CASE WHEN sle.is_opening != 'Yes' AND sle.qty_diff < 0 THEN -sle.qty_diff ELSE 0 END) as out_qty,
+			SUM(CASE WHEN sle.is_opening != 'Yes' AND sle.qty_diff < 0 THEN ABS(sle.stock_value_difference) ELSE 0 END) as out_value
+		FROM (
+			SELECT
+				sle.posting_date,
+				sle.warehouse,
+				IFNULL(sle.is_opening, 'No') as is_opening,
+				sle.stock_value_difference,
+				CASE
+					WHEN sle.voucher_type = 'Stock Reconciliation'
+					AND (IFNULL(sle.batch_no, '') = '' OR IFNULL(sle.serial_no, '') != '')
+					THEN sle.qty_after_transaction - IFNULL((
+						SELECT prev.qty_after_transaction
+						FROM `tabStock Ledger Entry` prev
+						WHERE prev.item_code = sle.item_code
+						AND prev.warehouse = sle.warehouse
+						AND prev.is_cancelled = 0
+						AND (prev.posting_date, prev.posting_time, prev.creation)
+							< (sle.posting_date, sle.posting_time, sle.creation)
+						ORDER BY prev.posting_date DESC, prev.posting_time DESC, prev.creation DESC
+						LIMIT 1
+					), 0)
+					ELSE sle.actual_qty
+				END as qty_diff
+			FROM `tabStock Ledger Entry` sle
+			WHERE sle.company = %(company)s
+			AND sle.posting_date BETWEEN %(from_date)s AND %(to_date)s
+			AND sle.is_cancelled = 0
+		) sle
+		GROUP BY sle.posting_date, sle.warehouse
+	""",
+		values,
+		as_dict=True,
+	)
+
+	frappe.db.sql(
+		"""
+		DELETE FROM `tabStock Movement Summary`
+		WHERE company = %(company)s
+		AND posting_date BETWEEN %(from_date)s AND %(to_date)s
+	""",
+		values,
+	)
+
+	if rows:
+		save_summary_rows(rows, company)
+
+	invalidate_doctype("Stock Movement Summary")
+	return len(rows)
+
+
+def update_reposted_days(since=None):
+	"""Scheduler job: reposting rewrites the value of later ledger entries without doc events,
+	so recompute each company from the earliest posting date reposted since yesterday"""
+	since = since or add_days(now(), -1)
+
+	reposts = frappe.db.sql(
+		"""
+		SELECT company, MIN(posting_date)
+		FROM `tabRepost Item Valuation`
+		WHERE docstatus = 1
+		AND status = 'Completed'
+		AND modified >= %(since)s
+		GROUP BY company
+	""",
+		{"since": since},
+	)
+
+	for company, from_date in reposts:
+		update_summary(company, from_date, today())
+
+
+def rebuild_summary(company=None):
+	"""Rebuild the summary from the whole ledger, one year at a time"""
+	companies = [company] if company else frappe.get_all("Company", pluck="name")
+
+	for company in companies:
+		first_date = frappe.db.get_value(
+			"Stock Ledger Entry", {"company": company, "is_cancelled": 0}, "MIN(posting_date)"
+		)
+		if not first_date:
+			continue
+
+		from_date = getdate(first_date)
+		while from_date <= getdate(today()):
+			to_date = add_days(from_date.replace(year=from_date.year + 1, month=1, day=1), -1)
+			update_summary(company, from_date, to_date)
+			frappe.db.commit()
+			from_date = add_days(to_date, 1)
+
+
+def save_summary_rows(rows, company):
+	timestamp = now()
+	user = frappe.session.user
+
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"modified_by",
+		"owner",
+		"docstatus",
+		"posting_date",
+		"company",
+		"warehouse",
+	]
+	fields.extend(SUMMARY_FIELDS)
+
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			user,
+			user,
+			0,
+			row.posting_date,
+			company,
+			row.warehouse,
+			*(row.get(field) for field in SUMMARY_FIELDS),
+		)
+		for row in rows
+	]
+
+	frappe.db.bulk_insert("Stock Movement Summary", fields, values)
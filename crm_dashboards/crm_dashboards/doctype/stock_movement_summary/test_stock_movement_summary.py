@@ -0,0 +1,56 @@
+# Copyright (c) 2025, Meghwin Dave and Contributors
+# See license.txt
+
+import frappe
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.doctype.stock_reconciliation.test_stock_reconciliation import (
+	create_stock_reconciliation,
+)
+from erpnext.stock.doctype.warehouse.test_warehouse import create_warehouse
+from erpnext.stock.report.stock_balance.stock_balance import execute as stock_balance
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, today
+
+from crm_dashboards.crm_dashboards.doctype.stock_movement_summary.stock_movement_summary import (
+	update_summary,
+)
+
+COMPANY = "_Test Company"
+
+
+class TestStockMovementSummary(FrappeTestCase):
+	def test_totals_match_stock_balance(self):
+		item = make_item("_Test Stock Movement Summary Item", {"is_stock_item": 1}).name
+		warehouse = create_warehouse("_Test Stock Movement Summary Warehouse", company=COMPANY)
+
+		make_stock_entry(item_code=item, target=warehouse, qty=50, basic_rate=10)
+		make_stock_entry(item_code=item, source=warehouse, qty=20)
+		# Reconciliations post actual_qty 0, the change is against the balance before them
+		create_stock_reconciliation(item_code=item, warehouse=warehouse, qty=130, rate=10)
+		create_stock_reconciliation(item_code=item, warehouse=warehouse, qty=100, rate=10)
+
+		update_summary(COMPANY, today())
+		summary = frappe.db.get_value(
+			"Stock Movement Summary",
+			{"company": COMPANY, "posting_date": today(), "warehouse": warehouse},
+			["in_qty", "in_value", "out_qty", "out_value"],
+			as_dict=True,
+		)
+
+		self.assertEqual(flt(summary.in_qty), 150)
+		self.assertEqual(flt(summary.out_qty), 50)
+
+		_columns, data = stock_balance(
+			frappe._dict(
+				company=COMPANY, from_date=today(), to_date=today(), item_code=item, warehouse=warehouse
+			)
+		)[:2]
+
+		for field, balance_field in (
+			("in_qty", "in_qty"),
+			("in_value", "in_val"),
+			("out_qty", "out_qty"),
+			("out_value", "out_val"),
+		):
+			self.assertAlmostEqual(flt(summary[field]), flt(data[0][balance_field]), places=2)
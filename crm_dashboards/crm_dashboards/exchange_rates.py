@@ -0,0 +1,133 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import hashlib
+from bisect import bisect_right
+
+import erpnext
+import frappe
+from frappe.utils import flt, getdate
+
+DAILY_RATE_TABLE = "_crm_daily_exchange_rate"
+
+
+class ExchangeRateTable:
+	"""Selling rates into one currency from Currency Exchange, loaded once per run"""
+
+	def __init__(self, to_currency):
+		self.to_currency = to_currency
+		self.rates = {}
+
+		rows = frappe.db.sql(
+			"""
+			SELECT ce.from_currency, ce.to_currency, ce.date, ce.exchange_rate
+			FROM `tabCurrency Exchange` ce
+			WHERE (ce.to_currency = %(currency)s OR ce.from_currency = %(currency)s)
+			AND ce.for_selling = 1
+			AND ce.exchange_rate > 0
+			ORDER BY ce.date
+		""",
+			{"currency": to_currency},
+			as_dict=True,
+		)
+
+		direct, inverse = {}, {}
+		for row in rows:
+			if row.to_currency == to_currency:
+				direct.setdefault(row.from_currency, []).append((getdate(row.date), flt(row.exchange_rate)))
+			else:
+				inverse.setdefault(row.to_currency, []).append(
+					(getdate(row.date), 1 / flt(row.exchange_rate))
+				)
+
+		# Prefer quoted rates into the target currency, fall back to inverted quotes
+		for currency, entries in {**inverse, **direct}.items():
+			self.rates[currency] = ([entry[0] for entry in entries], [entry[1] for entry in entries])
+
+	def get_rate(self, currency, date):
+		"""Latest rate on or before date, the earliest known rate before that, None if unknown"""
+		if not currency or currency == self.to_currency:
+			return 1.0
+
+		if currency not in self.rates:
+			return None
+
+		dates, rates = self.rates[currency]
+		idx = bisect_right(dates, getdate(date)) - 1
+		return rates[max(idx, 0)]
+
+
+def get_company_currency(filters):
+	company = filters.get("company") or erpnext.get_default_company()
+	return erpnext.get_company_currency(company) if company else frappe.get_default("currency")
+
+
+def convert_rows(data, company_currency, date_field="transaction_date", fields=("amount", "weighted_amount")):
+	"""Add base_<field> values in company currency to each row, one rate lookup per row"""
+	rate_table = ExchangeRateTable(company_currency)
+
+	for row in data:
+		rate = rate_table.get_rate(row.get("currency"), row.get(date_field))
+		if rate is None:
+			rate = flt(row.get("conversion_rate")) or 1.0
+
+		row["exchange_rate"] = rate
+		row["company_currency"] = company_currency
+		for field in fields:
+			row["base_" + field] = flt(row.get(field)) * rate
+
+	return data
+
+
+def create_daily_rate_table(company_currency, pairs):
+	"""Materialize the rates of the given (currency, date) pairs into a temporary table so
+	aggregate queries can join on it; get_rate_pairs lists the pairs a query will join. Pairs
+	without a quoted rate are left out. Temporary tables live as long as the connection, so a
+	set of pairs is loaded once per request and later calls, e.g. other charts in a dashboard
+	batch, reuse it"""
+	pairs = sorted({(currency, getdate(date)) for currency, date in pairs if currency and date})
+	key = (company_currency, hashlib.sha1(repr(pairs).encode()).hexdigest())
+
+	tables = getattr(frappe.local, "crm_daily_rate_tables", None)
+	if tables is None:
+		tables = frappe.local.crm_daily_rate_tables = {}
+	if key in tables:
+		return tables[key]
+
+	table = f"{DAILY_RATE_TABLE}_{len(tables)}"
+	frappe.db.sql(f"DROP TEMPORARY TABLE IF EXISTS `{table}`")
+	frappe.db.sql(f"""
+		CREATE TEMPORARY TABLE `{table}` (
+			currency VARCHAR(140) NOT NULL,
+			rate_date DATE NOT NULL,
+			exchange_rate DECIMAL(21, 9) NOT NULL,
+			PRIMARY KEY (currency, rate_date)
+		)
+	""")
+
+	if pairs:
+		rate_table = ExchangeRateTable(company_currency)
+		rows = []
+		for currency, date in pairs:
+			rate = rate_table.get_rate(currency, date)
+			if currency != company_currency and rate is not None:
+				rows.append((currency, date, rate))
+
+		for start in range(0, len(rows), 1000):
+			insert_daily_rates(table, rows[start : start + 1000])
+
+	tables[key] = table
+	return table
+
+
+def get_rate_pairs(where, values):
+	"""Distinct (currency, transaction date) pairs of the opportunities matching where"""
+	return frappe.db.sql(
+		"SELECT DISTINCT opp.currency, opp.transaction_date FROM `tabOpportunity` opp " + where, values
+	)
+
+
+def insert_daily_rates(table, rows):
+	placeholders = ", ".join(["(%s, %s, %s)"] * len(rows))
+	values = [value for row in rows for value in row]
+	frappe.db.sql(f"INSERT INTO `{table}` (currency, rate_date, exchange_rate) VALUES {placeholders}", values)
@@ -0,0 +1,325 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+# Custom Number Card methods. Each figure comes from one aggregate query that also returns the
+# previous period's value, instead of running a whole report to read a single column.
+# Each card first checks report permission on the doctype it reads. Cached results are keyed by
+# the user's roles and user permissions, so a cache hit never skips a check that would fail.
+
+import frappe
+from frappe.utils import add_days, add_years, date_diff, flt, get_first_day, getdate, today
+
+from crm_dashboards.crm_dashboards.report.sales_budget.sales_budget import get_current_fiscal_year
+from crm_dashboards.crm_dashboards.report_cache import report_cache
+
+DEFAULT_PERIOD_DAYS = 30
+CARD_TTL = 10 * 60
+
+
+@frappe.whitelist()
+@report_cache("Opportunity Based Forecast", CARD_TTL)
+def get_opportunity_probability(filters=None):
+	"""Average probability of opportunities created in the period"""
+	frappe.has_permission("Opportunity", "report", throw=True)
+	filters = get_period_filters(filters)
+
+	current, previous = frappe.db.sql(
+		"""
+		SELECT
+			AVG(CASE WHEN opp.transaction_date >= %(from_date)s THEN opp.probability END),
+			AVG(CASE WHEN opp.transaction_date < %(from_date)s THEN opp.probability END)
+		FROM `tabOpportunity` opp
+		WHERE opp.docstatus != 2
+		AND opp.transaction_date BETWEEN %(previous_from_date)s AND %(to_date)s
+	""",
+		filters,
+	)[0]
+
+	return get_card(current, flt(previous), "Percent")
+
+
+@frappe.whitelist()
+@report_cache("Deal Loss", CARD_TTL)
+def get_lost_deal_amount(filters=None):
+	"""Company-currency amount of opportunities lost in the period"""
+	frappe.has_permission("Opportunity", "report", throw=True)
+	filters = get_period_filters(filters)
+
+	current, previous = frappe.db.sql(
+		"""
+		SELECT
+			SUM(CASE WHEN opp.lost_date >= %(from_date)s THEN opp.base_opportunity_amount END),
+			SUM(CASE WHEN opp.lost_date < %(from_date)s THEN opp.base_opportunity_amount END)
+		FROM `tabOpportunity` opp
+		WHERE opp.status = 'Lost'
+		AND opp.docstatus != 2
+		AND opp.lost_date BETWEEN %(previous_from_date)s AND %(to_date)s
+	""",
+		filters,
+	)[0]
+
+	return get_card(current, flt(previous), "Currency")
+
+
+@frappe.whitelist()
+@report_cache("Project Tracker", CARD_TTL)
+def get_project_order_value(filters=None):
+	"""Order value of projects starting in the period"""
+	frappe.has_permission("Project", "report", throw=True)
+	filters = get_period_filters(filters)
+
+	current, previous = frappe.db.sql(
+		"""
+		SELECT
+			SUM(CASE WHEN p.expected_start_date >= %(from_date)s THEN p.project_order_value END),
+			SUM(CASE WHEN p.expected_start_date < %(from_date)s THEN p.project_order_value END)
+		FROM `tabProject` p
+		WHERE p.docstatus = 0
+		AND p.expected_start_date BETWEEN %(previous_from_date)s AND %(to_date)s
+	""",
+		filters,
+	)[0]
+
+	return get_card(current, flt(previous), "Currency")
+
+
+@frappe.whitelist()
+@report_cache("Customer Profile", CARD_TTL)
+def get_customer_count(filters=None):
+	"""Customers now, against the count at the start of the month"""
+	frappe.has_permission("Customer", "report", throw=True)
+	filters = frappe._dict(frappe.parse_json(filters or "{}"))
+	condition = "AND c.disabled = 0" if filters.get("status") == "Active" else ""
+
+	current, previous = frappe.db.sql(
+		f"""
+		SELECT COUNT(c.name), COUNT(CASE WHEN c.creation < %(month_start)s THEN 1 END)
+		FROM `tabCustomer` c
+		WHERE c.docstatus = 0
+		{condition}
+	""",
+		{"month_start": get_first_day(today())},
+	)[0]
+
+	return get_card(current, flt(previous), "Int")
+
+
+@frappe.whitelist()
+@report_cache("Customer Profile", CARD_TTL)
+def get_ongoing_projects(filters=None):
+	"""Ongoing projects recorded on customer profiles"""
+	frappe.has_permission("Customer", "report", throw=True)
+	value = frappe.db.sql("""
+		SELECT SUM(c.ongoing_projects)
+		FROM `tabCustomer` c
+		WHERE c.docstatus = 0
+	""")[0][0]
+
+	return get_card(value, fieldtype="Int")
+
+
+@frappe.whitelist()
+def get_target_sales(filters=None):
+	totals = get_sales_budget_totals(filters)
+	return get_card(totals.target_sales, totals.previous_target_sales, "Currency")
+
+
+@frappe.whitelist()
+def get_actual_sales(filters=None):
+	totals = get_sales_budget_totals(filters)
+	return get_card(totals.actual_sales, totals.previous_actual_sales, "Currency")
+
+
+@frappe.whitelist()
+def get_shortfall_or_excess_sales(filters=None):
+	totals = get_sales_budget_totals(filters)
+	return get_card(
+		totals.target_sales - totals.actual_sales,
+		totals.previous_target_sales - totals.previous_actual_sales,
+		"Currency",
+	)
+
+
+@frappe.whitelist()
+def get_stock_in_qty(filters=None):
+	totals = get_stock_movement_totals(filters)
+	return get_card(totals.in_qty, totals.previous_in_qty, "Float")
+
+
+@frappe.whitelist()
+def get_stock_in_value(filters=None):
+	totals = get_stock_movement_totals(filters)
+	return get_card(totals.in_value, totals.previous_in_value, "Currency")
+
+
+@frappe.whitelist()
+def get_stock_out_qty(filters=None):
+	totals = get_stock_movement_totals(filters)
+	return get_card(totals.out_qty, totals.previous_out_qty, "Float")
+
+
+@frappe.whitelist()
+def get_stock_out_value(filters=None):
+	totals = get_stock_movement_totals(filters)
+	return get_card(totals.out_value, totals.previous_out_value, "Currency")
+
+
+@report_cache("Stock Movement Summary", CARD_TTL)
+def get_stock_movement_totals(filters=None):
+	"""In and out quantity and value in the period and the one before it, from the daily
+	Stock Movement Summary. The four stock cards share one cached result"""
+	frappe.has_permission("Stock Movement Summary", "report", throw=True)
+	filters = get_period_filters(filters)
+
+	conditions = []
+	if filters.get("company"):
+		conditions.append("sms.company = %(company)s")
+
+	# Selecting a group warehouse includes the warehouses under it
+	warehouses = filters.get("warehouse")
+	if warehouses:
+		filters.warehouse = [warehouses] if isinstance(warehouses, str) else warehouses
+		conditions.append("""sms.warehouse IN (
+			SELECT wh.name
+			FROM `tabWarehouse` wh
+			INNER JOIN `tabWarehouse` parent ON wh.lft >= parent.lft AND wh.rgt <= parent.rgt
+			WHERE parent.name IN %(warehouse)s
+		)""")
+
+	row = frappe.db.sql(
+		"""
+		SELECT
+			SUM(CASE WHEN sms.posting_date >= %(from_date)s THEN sms.in_qty END) as in_qty,
+			SUM(CASE WHEN sms.posting_date >= %(from_date)s THEN sms.in_value END) as in_value,
+			SUM(CASE WHEN sms.posting_date >= %(from_date)s THEN sms.out_qty END) as out_qty,
+			SUM(CASE WHEN sms.posting_date >= %(from_date)s THEN sms.out_value END) as out_value,
+			SUM(CASE WHEN sms.posting_date < %(from_date)s THEN sms.in_qty END) as previous_in_qty,
+			SUM(CASE WHEN sms.posting_date < %(from_date)s THEN sms.in_value END) as previous_in_value,
+			SUM(CASE WHEN sms.posting_date < %(from_date)s THEN sms.out_qty END) as previous_out_qty,
+			SUM(CASE WHEN sms.posting_date < %(from_date)s THEN sms.out_value END) as previous_out_value
+		FROM `tabStock Movement Summary` sms
+		WHERE sms.posting_date BETWEEN %(previous_from_date)s AND %(to_date)s
+		{conditions}
+	""".format(conditions="".join(" AND " + condition for condition in conditions)),
+		filters,
+		as_dict=True,
+	)[0]
+
+	return frappe._dict({field: flt(value) for field, value in row.items()})
+
+
+@report_cache("Sales Budget Totals", CARD_TTL)
+def get_sales_budget_totals(filters=None):
+	"""Fiscal year target and actual sales, and the previous fiscal year's up to the same day.
+	The three Sales Budget cards share one cached result"""
+	frappe.has_permission("Sales Invoice", "report", throw=True)
+	filters = frappe._dict(frappe.parse_json(filters or "{}"))
+	fiscal_year = filters.get("fiscal_year") or get_current_fiscal_year()
+	current = frappe.db.get_value(
+		"Fiscal Year", fiscal_year, ["year_start_date", "year_end_date"], as_dict=True
+	)
+	totals = frappe._dict(target_sales=0, actual_sales=0, previous_target_sales=0, previous_actual_sales=0)
+	if not current:
+		return totals
+
+	previous = frappe.db.get_value(
+		"Fiscal Year",
+		{"year_end_date": add_days(current.year_start_date, -1)},
+		["name", "year_start_date", "year_end_date"],
+		as_dict=True,
+	) or frappe._dict(
+		year_start_date=add_years(current.year_start_date, -1),
+		year_end_date=add_days(current.year_start_date, -1),
+	)
+	elapsed = date_diff(min(getdate(today()), getdate(current.year_end_date)), current.year_start_date)
+
+	values = dict(
+		filters,
+		fiscal_year=fiscal_year,
+		previous_fiscal_year=previous.name,
+		from_date=current.year_start_date,
+		to_date=current.year_end_date,
+		previous_from_date=previous.year_start_date,
+		previous_to_date=min(
+			getdate(add_days(previous.year_start_date, elapsed)), getdate(previous.year_end_date)
+		),
+	)
+
+	sales_person_conditions = []
+	if filters.get("sales_person"):
+		sales_person_conditions.append("sp.name = %(sales_person)s")
+	if filters.get("territory"):
+		sales_person_conditions.append("sp.territory = %(territory)s")
+
+	target = frappe.db.sql(
+		"""
+		SELECT
+			SUM(CASE WHEN td.fiscal_year = %(fiscal_year)s THEN td.target_amount END),
+			SUM(CASE WHEN td.fiscal_year = %(previous_fiscal_year)s THEN td.target_amount END)
+		FROM `tabTarget Detail` td
+		INNER JOIN `tabSales Person` sp ON sp.name = td.parent
+		WHERE td.parenttype = 'Sales Person'
+		AND sp.enabled = 1
+		AND td.fiscal_year IN (%(fiscal_year)s, %(previous_fiscal_year)s)
+		{conditions}
+	""".format(conditions="".join(" AND " + condition for condition in sales_person_conditions)),
+		values,
+	)[0]
+
+	invoice_conditions = []
+	if filters.get("territory"):
+		invoice_conditions.append("si.territory = %(territory)s")
+
+	if filters.get("sales_person"):
+		amount = "st.allocated_amount"
+		join = "INNER JOIN `tabSales Team` st ON st.parent = si.name AND st.parenttype = 'Sales Invoice'"
+		invoice_conditions.append("st.sales_person = %(sales_person)s")
+	else:
+		amount, join = "si.base_net_total", ""
+
+	actual = frappe.db.sql(
+		"""
+		SELECT
+			SUM(CASE WHEN si.posting_date >= %(from_date)s THEN {amount} END),
+			SUM(CASE WHEN si.posting_date <= %(previous_to_date)s THEN {amount} END)
+		FROM `tabSales Invoice` si
+		{join}
+		WHERE si.docstatus = 1
+		AND (si.posting_date BETWEEN %(from_date)s AND %(to_date)s
+			OR si.posting_date BETWEEN %(previous_from_date)s AND %(previous_to_date)s)
+		{conditions}
+	""".format(
+			amount=amount,
+			join=join,
+			conditions="".join(" AND " + condition for condition in invoice_conditions),
+		),
+		values,
+	)[0]
+
+	totals.target_sales, totals.previous_target_sales = flt(target[0]), flt(target[1])
+	totals.actual_sales, totals.previous_actual_sales = flt(actual[0]), flt(actual[1])
+	return totals
+
+
+def get_period_filters(filters=None):
+	"""Card filters with the period defaulted to the last 30 days and the equally long period before it"""
+	filters = frappe._dict(frappe.parse_json(filters or "{}"))
+	filters.to_date = getdate(filters.get("to_date") or today())
+	filters.from_date = getdate(
+		filters.get("from_date") or add_days(filters.to_date, -DEFAULT_PERIOD_DAYS + 1)
+	)
+	filters.previous_from_date = add_days(
+		filters.from_date, -(date_diff(filters.to_date, filters.from_date) + 1)
+	)
+	return filters
+
+
+def get_card(value, previous=None, fieldtype="Int"):
+	"""Number Card payload; previous_value and percentage carry the trend against the previous period"""
+	card = {"value": flt(value), "fieldtype": fieldtype}
+
+	if previous is not None:
+		card["previous_value"] = previous
+		card["percentage"] = (flt(value) - previous) * 100 / abs(previous) if previous else None
+
+	return card
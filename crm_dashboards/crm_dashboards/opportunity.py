@@ -0,0 +1,20 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import today
+
+
+def set_lost_date(doc, method=None):
+	"""Opportunity validate: stamp lost_date when the status becomes Lost, clear it on reopen"""
+	if doc.status == "Lost":
+		if not doc.get("lost_date") or doc.has_value_changed("status"):
+			doc.lost_date = today()
+	elif doc.get("lost_date"):
+		doc.lost_date = None
+
+
+def update_lost_date(doc, method=None):
+	"""Opportunity on_change: catch status changes written without validate, e.g. set_status(update=True)"""
+	if doc.status == "Lost" and not frappe.db.get_value("Opportunity", doc.name, "lost_date"):
+		doc.db_set("lost_date", today(), update_modified=False)
@@ -0,0 +1,168 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, add_months, cint, flt, get_first_day, getdate, today
+
+from crm_dashboards.crm_dashboards.exchange_rates import (
+	create_daily_rate_table,
+	get_company_currency,
+	get_rate_pairs,
+)
+from crm_dashboards.crm_dashboards.profiler import profile_section
+
+OPEN_STATUSES = ("Open", "Quotation", "Replied")
+
+GROUP_BY_FIELDS = {
+	"Sales Stage": "opp.sales_stage",
+	"Sales Person": "opp.opportunity_owner",
+}
+
+# Opportunity amount in company currency, see exchange_rates.create_daily_rate_table
+BASE_AMOUNT = "opp.opportunity_amount * COALESCE(rate.exchange_rate, NULLIF(opp.conversion_rate, 0), 1)"
+
+
+def get_horizon_periods(filters):
+	"""Start dates of the next N months or weeks, beginning with the current one"""
+	periods = max(cint(filters.get("periods")) or 6, 1)
+	current = getdate(today())
+
+	if filters.get("periodicity") == "Weekly":
+		start = add_days(current, -current.weekday())
+		return [add_days(start, 7 * i) for i in range(periods)], add_days(start, 7 * periods - 1)
+
+	start = get_first_day(current)
+	return [add_months(start, i) for i in range(periods)], add_days(add_months(start, periods), -1)
+
+
+def get_period_expression(filters):
+	if filters.get("periodicity") == "Weekly":
+		return "DATE_SUB(opp.expected_closing, INTERVAL WEEKDAY(opp.expected_closing) DAY)"
+
+	return "DATE_SUB(opp.expected_closing, INTERVAL DAYOFMONTH(opp.expected_closing) - 1 DAY)"
+
+
+def get_period_label(period_start, filters):
+	if filters.get("periodicity") == "Weekly":
+		return _("Week of {0}").format(period_start.strftime("%d %b %Y"))
+
+	return period_start.strftime("%b %Y")
+
+
+def prepare_horizon_query(filters, conditions=""):
+	"""WHERE clause, query values and company-currency rate table for open pipeline in the horizon"""
+	period_starts, horizon_end = get_horizon_periods(filters)
+	company_currency = get_company_currency(filters)
+
+	values = dict(
+		filters, horizon_start=period_starts[0], horizon_end=horizon_end, open_statuses=OPEN_STATUSES
+	)
+	where = f"""
+		WHERE opp.docstatus != 2
+		AND opp.status IN %(open_statuses)s
+		AND opp.expected_closing BETWEEN %(horizon_start)s AND %(horizon_end)s
+		{conditions}
+	"""
+
+	rate_table = create_daily_rate_table(company_currency, get_rate_pairs(where, values))
+
+	return frappe._dict(
+		values=values,
+		where=where,
+		rate_table=rate_table,
+		period_starts=period_starts,
+		company_currency=company_currency,
+	)
+
+
+def get_horizon_data(filters, conditions=""):
+	"""Weighted and unweighted open pipeline per expected-closing period and group, in one query"""
+	horizon = prepare_horizon_query(filters, conditions)
+	group_field = GROUP_BY_FIELDS.get(filters.get("group_by")) or GROUP_BY_FIELDS["Sales Stage"]
+
+	data = frappe.db.sql(
+		f"""
+		SELECT
+			{get_period_expression(filters)} as period_start,
+			{group_field} as group_value,
+			COUNT(opp.name) as opportunities,
+			SUM({BASE_AMOUNT}) as pipeline_amount,
+			SUM({BASE_AMOUNT} * opp.probability / 100) as weighted_amount
+		FROM `tabOpportunity` opp
+		LEFT JOIN `{horizon.rate_table}` rate
+			ON rate.currency = opp.currency AND rate.rate_date = opp.transaction_date
+		{horizon.where}
+		GROUP BY period_start, group_value
+		ORDER BY period_start, weighted_amount DESC
+	""",
+		horizon.values,
+		as_dict=True,
+	)
+
+	for row in data:
+		row.period = get_period_label(getdate(row.period_start), filters)
+		row.group_value = row.group_value or _("Not Set")
+		row.company_currency = horizon.company_currency
+
+	return data, horizon.period_starts
+
+
+def get_group_by_label(filters):
+	if filters.get("group_by") == "Sales Person":
+		return _("Sales Person")
+
+	return _("Sales Stage")
+
+
+def get_horizon_columns(filters):
+	return [
+		{"fieldname": "period", "label": _("Expected Close Period"), "fieldtype": "Data", "width": 150},
+		{"fieldname": "group_value", "label": get_group_by_label(filters), "fieldtype": "Data", "width": 180},
+		{"fieldname": "opportunities", "label": _("Opportunities"), "fieldtype": "Int", "width": 110},
+		{
+			"fieldname": "pipeline_amount",
+			"label": _("Pipeline Amount"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 160,
+		},
+		{
+			"fieldname": "weighted_amount",
+			"label": _("Weighted Amount"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 160,
+		},
+	]
+
+
+def get_horizon_chart(data, period_starts, filters):
+	"""Stacked bar of weighted pipeline per period, one dataset per group"""
+	period_index = {getdate(start): i for i, start in enumerate(period_starts)}
+	group_values = {}
+
+	for row in data:
+		values = group_values.setdefault(row.group_value, [0] * len(period_starts))
+		values[period_index[getdate(row.period_start)]] += flt(row.weighted_amount)
+
+	return {
+		"data": {
+			"labels": [get_period_label(getdate(start), filters) for start in period_starts],
+			"datasets": [
+				{"name": group_value, "values": values} for group_value, values in group_values.items()
+			],
+		},
+		"type": "bar",
+		"barOptions": {"stacked": 1},
+		"fieldtype": "Currency",
+	}
+
+
+def execute_horizon(filters, conditions=""):
+	"""Report result for the Horizon view of the forecast reports"""
+	data, period_starts = get_horizon_data(filters, conditions)
+	with profile_section("chart"):
+		chart = get_horizon_chart(data, period_starts, filters)
+
+	return get_horizon_columns(filters), data, None, chart
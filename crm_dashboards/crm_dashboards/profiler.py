@@ -0,0 +1,122 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+# Opt-in profiling of report runs. With crm_report_profile_sample_rate (0 to 1) set in
+# site_config.json, that share of the results report_cache computes are timed and logged
+# to Report Profile Log; see the Report Profile Summary report.
+
+import json
+import random
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cstr, flt
+
+SAMPLE_RATE_KEY = "crm_report_profile_sample_rate"
+
+
+def run_profiled(name, method, compute, filters):
+	"""compute(filters), counting its SQL statements and timing it when the run is sampled"""
+	if getattr(frappe.local, "crm_report_profile", None) or not is_sampled():
+		return compute(filters)
+
+	profile = frappe._dict(queries=0, db_time=0.0, sections={})
+	db = frappe.db
+	patched_sql = db.__dict__.get("sql")
+	sql = db.sql
+
+	def counted_sql(*args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return sql(*args, **kwargs)
+		finally:
+			profile.queries += 1
+			profile.db_time += time.perf_counter() - start
+
+	frappe.local.crm_report_profile = profile
+	db.sql = counted_sql
+	start = time.perf_counter()
+	try:
+		result = compute(filters)
+	finally:
+		elapsed = time.perf_counter() - start
+		if patched_sql:
+			db.sql = patched_sql
+		else:
+			del db.sql
+		frappe.local.crm_report_profile = None
+
+	log_profile(name, method, filters, result, elapsed, profile)
+	return result
+
+
+@contextmanager
+def profile_section(section):
+	"""Time a part of a profiled run, e.g. building the chart. Queries run inside it count as
+	database time only"""
+	profile = getattr(frappe.local, "crm_report_profile", None)
+	if not profile:
+		yield
+		return
+
+	start, db_time = time.perf_counter(), profile.db_time
+	try:
+		yield
+	finally:
+		elapsed = time.perf_counter() - start - (profile.db_time - db_time)
+		profile.sections[section] = profile.sections.get(section, 0) + elapsed
+
+
+def is_sampled():
+	rate = flt(frappe.conf.get(SAMPLE_RATE_KEY))
+	return rate > 0 and random.random() < rate
+
+
+def log_profile(name, method, filters, result, elapsed, profile):
+	chart_time = profile.sections.get("chart", 0)
+
+	frappe.deferred_insert(
+		"Report Profile Log",
+		[
+			{
+				"report_name": name,
+				"method": method,
+				"filter_shape": get_filter_shape(filters),
+				"query_count": profile.queries,
+				"row_count": get_row_count(result),
+				"payload_bytes": len(json.dumps(result, default=cstr, separators=(",", ":"))),
+				"total_ms": to_ms(elapsed),
+				"db_ms": to_ms(profile.db_time),
+				"chart_ms": to_ms(chart_time),
+				"python_ms": to_ms(max(elapsed - profile.db_time - chart_time, 0)),
+			}
+		],
+	)
+
+
+def get_filter_shape(filters):
+	"""The filters that were set, without their values"""
+	if isinstance(filters, str):
+		filters = frappe.parse_json(filters)
+
+	return (
+		", ".join(sorted(key for key, value in (filters or {}).items() if value not in (None, "", []))) or "-"
+	)
+
+
+def get_row_count(result):
+	"""Report rows, chart labels, or 1 for a number card"""
+	if isinstance(result, tuple | list):
+		return len(result[1] or []) if len(result) > 1 else len(result)
+
+	if isinstance(result, dict):
+		if "value" in result:
+			return 1
+		return len((result.get("data") or {}).get("labels") or [])
+
+	return 0
+
+
+def to_ms(seconds):
+	return flt(seconds * 1000, 3)
@@ -22,6 +22,12 @@ frappe.query_reports["Customer Profile"] = {
 			"fieldtype": "Select",
 			"options": "Company\nIndividual\nPartnership"
 		},
+		{
+			"fieldname": "rfm_segment",
+			"label": __("RFM Segment"),
+			"fieldtype": "Select",
+			"options": "\nChampions\nLoyal Customers\nPotential Loyalists\nNew Customers\nNeed Attention\nAt Risk\nCannot Lose Them\nHibernating\nLost"
+		},
 		{
 			"fieldname": "status",
 			"label": __("Status"),
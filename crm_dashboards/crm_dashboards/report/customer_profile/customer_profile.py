@@ -5,11 +5,16 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate
 
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
 
+
+@report_cache("Customer Profile")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data, filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data, filters)
 	
 	return columns, data, None, chart
 
@@ -79,6 +84,18 @@ def get_columns():
 			"fieldtype": "Data",
 			"width": 120
 		},
+		{
+			"fieldname": "rfm_segment",
+			"label": _("RFM Segment"),
+			"fieldtype": "Data",
+			"width": 150
+		},
+		{
+			"fieldname": "rfm_score",
+			"label": _("RFM Score"),
+			"fieldtype": "Data",
+			"width": 100
+		},
 		{
 			"fieldname": "company_registered",
 			"label": _("Company Registered"),
@@ -159,10 +176,13 @@ def get_data(filters):
 			COALESCE(c.area_of_specialization, '') as area_of_specialization,
 			COALESCE(c.other_business_with_us, '') as other_business_with_us,
 			COALESCE(c.experience_rating, '') as experience_rating,
-			COALESCE(c.suggestions_for_improvement, '') as suggestions_for_improvement
+			COALESCE(c.suggestions_for_improvement, '') as suggestions_for_improvement,
+			COALESCE(rfm.segment, 'Not Scored') as rfm_segment,
+			COALESCE(rfm.rfm_score, '') as rfm_score
 		FROM `tabCustomer` c
 		LEFT JOIN `tabSales Team` st ON c.name = st.parent
 		LEFT JOIN `tabSales Person` sp ON st.sales_person = sp.name
+		LEFT JOIN `tabCustomer RFM Score` rfm ON rfm.customer = c.name
 		WHERE c.docstatus = 0
 		{conditions}
 		ORDER BY c.customer_name
@@ -195,6 +215,9 @@ def get_conditions(filters):
 	if filters.get("customer_type"):
 		conditions.append("c.customer_type = %(customer_type)s")
 	
+	if filters.get("rfm_segment"):
+		conditions.append("rfm.segment = %(rfm_segment)s")
+	
 	if filters.get("status"):
 		if filters.get("status") == "Active":
 			conditions.append("c.disabled = 0")
@@ -231,6 +254,11 @@ def get_chart_data(data=None, filters=None):
 	if chart3:
 		charts.append(chart3)
 	
+	# Chart 4: Pie chart of Customers by RFM Segment
+	chart4 = get_rfm_segment_chart(data)
+	if chart4:
+		charts.append(chart4)
+	
 	return charts
 
 
@@ -331,35 +359,78 @@ def get_sales_comparison_chart(data):
 	}
 
 
+def get_rfm_segment_chart(data):
+	"""Pie chart of Customers by RFM Segment"""
+	segment_customers = {}
+	
+	for row in data:
+		segment = row.rfm_segment or "Not Scored"
+		segment_customers.setdefault(segment, set()).add(row.customer_name)
+	
+	if not segment_customers:
+		return None
+	
+	return {
+		"data": {
+			"labels": list(segment_customers.keys()),
+			"datasets": [{
+				"name": "Customer Count",
+				"values": [len(customers) for customers in segment_customers.values()]
+			}]
+		},
+		"type": "pie",
+		"title": "Customers by RFM Segment"
+	}
+
+
 # Whitelisted methods for dashboard charts
 @frappe.whitelist()
+@report_cache("Customer Profile")
 def get_sales_projection_2025_by_sales_person(filters=None):
 	"""Whitelisted method for Sales Projection 2025 by Sales Person chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_sales_projection_chart(data)
+	with profile_section("chart"):
+		chart = get_sales_projection_chart(data)
 	return chart
 
 
 @frappe.whitelist()
+@report_cache("Customer Profile")
 def get_customers_by_type(filters=None):
 	"""Whitelisted method for Customers by Type chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_customer_type_chart(data)
+	with profile_section("chart"):
+		chart = get_customer_type_chart(data)
 	return chart
 
 
 @frappe.whitelist()
+@report_cache("Customer Profile")
 def get_sales_2024_vs_projection_2025(filters=None):
 	"""Whitelisted method for Sales 2024 vs Projection 2025 chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_sales_comparison_chart(data)
+	with profile_section("chart"):
+		chart = get_sales_comparison_chart(data)
+	return chart
+
+
+@frappe.whitelist()
+@report_cache("Customer Profile")
+def get_customers_by_rfm_segment(filters=None):
+	"""Whitelisted method for Customers by RFM Segment chart"""
+	if not filters:
+		filters = {}
+	
+	data = get_data(filters)
+	with profile_section("chart"):
+		chart = get_rfm_segment_chart(data)
 	return chart
@@ -36,6 +36,13 @@ frappe.query_reports["Daily Sales Report (Weekly)"] = {
 			"label": __("Customer"),
 			"fieldtype": "Link",
 			"options": "Customer"
+		},
+		{
+			"fieldname": "granularity",
+			"label": __("Group By"),
+			"fieldtype": "Select",
+			"options": "Visit\nDay\nWeek\nMonth",
+			"default": "Visit"
 		}
 	]
 };
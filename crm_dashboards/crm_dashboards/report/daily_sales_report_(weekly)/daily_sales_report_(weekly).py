@@ -5,11 +5,28 @@ import frappe
 from frappe import _
 from frappe.utils import getdate, flt
 
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
 
+
+PERIOD_EXPRESSIONS = {
+	"Day": "svl.date_of_visit",
+	"Week": "DATE_SUB(svl.date_of_visit, INTERVAL WEEKDAY(svl.date_of_visit) DAY)",
+	"Month": "DATE_SUB(svl.date_of_visit, INTERVAL DAYOFMONTH(svl.date_of_visit) - 1 DAY)",
+}
+
+
+@report_cache("Daily Sales Report (Weekly)")
 def execute(filters=None):
-	columns = get_columns()
-	data = get_data(filters)
-	chart = get_chart_data(data)
+	if filters.get("granularity") in PERIOD_EXPRESSIONS:
+		columns = get_period_columns()
+		data = get_period_data(filters)
+	else:
+		columns = get_columns()
+		data = get_data(filters)
+	
+	with profile_section("chart"):
+		chart = get_chart_data(filters=filters)
 	
 	return columns, data, None, chart
 
@@ -96,22 +113,114 @@ def get_data(filters):
 		ORDER BY svl.date_of_visit DESC, svl.sales_person
 	""".format(conditions=conditions)
 	
+	return frappe.db.sql(query, filters, as_dict=True)
+
+
+def get_period_columns():
+	return [
+		{
+			"fieldname": "period",
+			"label": _("Period"),
+			"fieldtype": "Data",
+			"width": 140
+		},
+		{
+			"fieldname": "sales_person",
+			"label": _("Sales Person"),
+			"fieldtype": "Link",
+			"options": "Sales Person",
+			"width": 150
+		},
+		{
+			"fieldname": "visits",
+			"label": _("Visits"),
+			"fieldtype": "Int",
+			"width": 90
+		},
+		{
+			"fieldname": "estimated_order_value",
+			"label": _("Estimated Order Value"),
+			"fieldtype": "Currency",
+			"width": 150
+		},
+		{
+			"fieldname": "order_lost_value",
+			"label": _("Order Lost Value"),
+			"fieldtype": "Currency",
+			"width": 150
+		}
+	]
+
+
+def get_period_data(filters):
+	"""Visits, estimated and lost value per period and sales person, bucketed in the database"""
+	granularity = get_granularity(filters)
+	conditions = get_conditions(filters)
+	
+	query = """
+		SELECT
+			{period} as period_start,
+			svl.sales_person,
+			COUNT(svl.name) as visits,
+			SUM(svl.estimated_order_value) as estimated_order_value,
+			SUM(svl.order_lost_value) as order_lost_value
+		FROM `tabSales Visit Log` svl
+		WHERE svl.docstatus = 1
+		{conditions}
+		GROUP BY period_start, svl.sales_person
+		ORDER BY period_start DESC, svl.sales_person
+	""".format(period=PERIOD_EXPRESSIONS[granularity], conditions=conditions)
+	
 	data = frappe.db.sql(query, filters, as_dict=True)
+	for row in data:
+		row.period = get_period_label(row.period_start, granularity)
+	
+	return data
+
+
+def get_chart_aggregates(filters):
+	"""Estimated and lost value per period across all sales persons"""
+	granularity = get_granularity(filters)
+	conditions = get_conditions(filters)
 	
-	# Format currency fields
+	query = """
+		SELECT
+			{period} as period_start,
+			COUNT(svl.name) as visits,
+			SUM(svl.estimated_order_value) as estimated_order_value,
+			SUM(svl.order_lost_value) as order_lost_value
+		FROM `tabSales Visit Log` svl
+		WHERE svl.docstatus = 1
+		{conditions}
+		GROUP BY period_start
+		ORDER BY period_start
+	""".format(period=PERIOD_EXPRESSIONS[granularity], conditions=conditions)
+	
+	data = frappe.db.sql(query, filters, as_dict=True)
 	for row in data:
-		if row.get('estimated_order_value'):
-			row['estimated_order_value'] = frappe.format_value(row['estimated_order_value'], {
-				'fieldtype': 'Currency'
-			})
-		if row.get('order_lost_value'):
-			row['order_lost_value'] = frappe.format_value(row['order_lost_value'], {
-				'fieldtype': 'Currency'
-			})
+		row.period = get_period_label(row.period_start, granularity)
 	
 	return data
 
 
+def get_granularity(filters):
+	# The row-level view charts weekly buckets, in keeping with the report's name
+	granularity = filters.get("granularity")
+	return granularity if granularity in PERIOD_EXPRESSIONS else "Week"
+
+
+def get_period_label(period_start, granularity):
+	period_start = getdate(period_start)
+	
+	if granularity == "Month":
+		return period_start.strftime("%b %Y")
+	
+	if granularity == "Week":
+		return _("Week of {0}").format(period_start.strftime("%d %b %Y"))
+	
+	return str(period_start)
+
+
 def get_conditions(filters):
 	conditions = []
 	
@@ -134,49 +243,30 @@ def get_conditions(filters):
 
 
 def get_chart_data(data=None, filters=None):
-	"""Prepare chart data for Estimated Order Value grouped by Date"""
+	"""Prepare chart data for Estimated Order Value grouped by period"""
 	
 	# If called from dashboard without parameters, get data ourselves
 	if data is None:
 		if filters is None:
 			filters = {}
-		data = get_data(filters)
-	
-	# Group data by date
-	date_data = {}
-	
-	for row in data:
-		date = row.get('date_of_visit')
-		estimated_value = row.get('estimated_order_value', 0)
-		
-		# Extract numeric value from formatted currency
-		if isinstance(estimated_value, str):
-			import re
-			numeric_value = re.sub(r'[^\d.-]', '', str(estimated_value))
-			try:
-				estimated_value = float(numeric_value) if numeric_value else 0
-			except ValueError:
-				estimated_value = 0
-		
-		if date in date_data:
-			date_data[date] += estimated_value
-		else:
-			date_data[date] = estimated_value
-	
-	# Sort dates for proper chart display
-	sorted_dates = sorted(date_data.keys())
-	values = [date_data[date] for date in sorted_dates]
+		data = get_chart_aggregates(filters)
 	
 	chart_data = {
 		"data": {
-			"labels": [str(date) for date in sorted_dates],
-			"datasets": [{
-				"name": "Estimated Order Value",
-				"values": values
-			}]
+			"labels": [row.get('period') for row in data],
+			"datasets": [
+				{
+					"name": "Estimated Order Value",
+					"values": [flt(row.get('estimated_order_value')) for row in data]
+				},
+				{
+					"name": "Order Lost Value",
+					"values": [flt(row.get('order_lost_value')) for row in data]
+				}
+			]
 		},
 		"type": "line",
-		"colors": ["#5e64ff"]
+		"colors": ["#5e64ff", "#ff5858"]
 	}
 	
 	return chart_data
@@ -184,11 +274,13 @@ def get_chart_data(data=None, filters=None):
 
 # Whitelisted method for dashboard chart
 @frappe.whitelist()
+@report_cache("Daily Sales Report (Weekly)")
 def get_daily_sales_weekly_trend(filters=None):
 	"""Whitelisted method for Daily Sales Weekly Trend chart"""
 	if not filters:
 		filters = {}
 	
-	data = get_data(filters)
-	chart = get_chart_data(data)
+	data = get_chart_aggregates(filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	return chart
@@ -32,11 +32,68 @@ frappe.query_reports["Deal Based Forecast"] = {
 				};
 			}
 		},
+		{
+			"fieldname": "company",
+			"label": __("Company"),
+			"fieldtype": "Link",
+			"options": "Company",
+			"default": frappe.defaults.get_user_default("Company")
+		},
 		{
 			"fieldname": "sales_stage",
 			"label": __("Sales Stage"),
 			"fieldtype": "Link",
 			"options": "Sales Stage"
+		},
+		{
+			"fieldname": "view",
+			"label": __("View"),
+			"fieldtype": "Select",
+			"options": "Opportunities\nHorizon\nSimulation",
+			"default": "Opportunities"
+		},
+		{
+			"fieldname": "periodicity",
+			"label": __("Periodicity"),
+			"fieldtype": "Select",
+			"options": "Monthly\nWeekly",
+			"default": "Monthly",
+			"depends_on": "eval:['Horizon', 'Simulation'].includes(doc.view)"
+		},
+		{
+			"fieldname": "periods",
+			"label": __("Periods"),
+			"fieldtype": "Int",
+			"default": 6,
+			"depends_on": "eval:['Horizon', 'Simulation'].includes(doc.view)"
+		},
+		{
+			"fieldname": "group_by",
+			"label": __("Group By"),
+			"fieldtype": "Select",
+			"options": "Sales Stage\nSales Person",
+			"default": "Sales Stage",
+			"depends_on": "eval:doc.view == 'Horizon'"
+		},
+		{
+			"fieldname": "trials",
+			"label": __("Trials"),
+			"fieldtype": "Int",
+			"default": 5000,
+			"depends_on": "eval:doc.view == 'Simulation'"
+		},
+		{
+			"fieldname": "seed",
+			"label": __("Seed"),
+			"fieldtype": "Int",
+			"depends_on": "eval:doc.view == 'Simulation'"
+		},
+		{
+			"fieldname": "time_budget",
+			"label": __("Time Budget (Seconds)"),
+			"fieldtype": "Float",
+			"default": 10,
+			"depends_on": "eval:doc.view == 'Simulation'"
 		}
 	]
 };
@@ -5,11 +5,31 @@ import frappe
 from frappe import _
 from frappe.utils import getdate, flt
 
+from crm_dashboards.crm_dashboards.exchange_rates import (
+	convert_rows,
+	create_daily_rate_table,
+	get_company_currency,
+	get_rate_pairs,
+)
+from crm_dashboards.crm_dashboards.pipeline import execute_horizon
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
+from crm_dashboards.crm_dashboards.simulation import execute_simulation
 
+
+@report_cache("Deal Based Forecast")
 def execute(filters=None):
+	if filters.get("view") in ("Horizon", "Simulation"):
+		# Both views are bounded by expected closing date, not by transaction date
+		horizon_filters = frappe._dict(filters, from_date=None, to_date=None)
+		if filters.get("view") == "Simulation":
+			return execute_simulation(horizon_filters, get_conditions(horizon_filters))
+		return execute_horizon(horizon_filters, get_conditions(horizon_filters))
+	
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	
 	return columns, data, None, chart
 
@@ -47,6 +67,7 @@ def get_columns():
 			"fieldname": "amount",
 			"label": _("Amount"),
 			"fieldtype": "Currency",
+			"options": "currency",
 			"width": 120
 		},
 		{
@@ -59,13 +80,28 @@ def get_columns():
 			"fieldname": "weighted_amount",
 			"label": _("Weighted Amount"),
 			"fieldtype": "Currency",
+			"options": "currency",
 			"width": 150
 		},
+		{
+			"fieldname": "base_weighted_amount",
+			"label": _("Weighted Amount (Company Currency)"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 180
+		},
 		{
 			"fieldname": "expected_closing_date",
 			"label": _("Expected Closing Date"),
 			"fieldtype": "Date",
 			"width": 150
+		},
+		{
+			"fieldname": "currency",
+			"label": _("Currency"),
+			"fieldtype": "Link",
+			"options": "Currency",
+			"width": 80
 		}
 	]
 
@@ -83,7 +119,9 @@ def get_data(filters):
 			opp.probability,
 			(opp.opportunity_amount * opp.probability / 100) as weighted_amount,
 			opp.expected_closing as expected_closing_date,
-			opp.currency
+			opp.currency,
+			opp.conversion_rate,
+			opp.transaction_date
 		FROM `tabOpportunity` opp
 		WHERE opp.docstatus != 2
 		AND opp.status IN ('Open', 'Quotation', 'Replied')
@@ -93,20 +131,38 @@ def get_data(filters):
 	
 	data = frappe.db.sql(query, filters, as_dict=True)
 	
-	# Format currency fields
-	for row in data:
-		if row.get('amount'):
-			row['amount'] = frappe.format_value(row['amount'], {
-				'fieldtype': 'Currency',
-				'currency': row.get('currency') or frappe.get_default('currency')
-			})
-		if row.get('weighted_amount'):
-			row['weighted_amount'] = frappe.format_value(row['weighted_amount'], {
-				'fieldtype': 'Currency',
-				'currency': row.get('currency') or frappe.get_default('currency')
-			})
+	return convert_rows(data, get_company_currency(filters))
+
+
+def get_chart_aggregates(filters):
+	"""Company-currency weighted amount per sales person summed in the database for chart-only callers"""
+	conditions = get_conditions(filters)
 	
-	return data
+	# Rates are joined on transaction date; rows without a quoted rate keep their own conversion rate
+	pairs = get_rate_pairs("""
+		WHERE opp.docstatus != 2
+		AND opp.status IN ('Open', 'Quotation', 'Replied')
+		{conditions}
+	""".format(conditions=conditions), filters)
+	rate_table = create_daily_rate_table(get_company_currency(filters), pairs)
+	
+	query = """
+		SELECT 
+			opp.opportunity_owner as sales_person,
+			SUM(
+				opp.opportunity_amount * opp.probability / 100
+				* COALESCE(rate.exchange_rate, NULLIF(opp.conversion_rate, 0), 1)
+			) as base_weighted_amount
+		FROM `tabOpportunity` opp
+		LEFT JOIN `{rate_table}` rate
+			ON rate.currency = opp.currency AND rate.rate_date = opp.transaction_date
+		WHERE opp.docstatus != 2
+		AND opp.status IN ('Open', 'Quotation', 'Replied')
+		{conditions}
+		GROUP BY opp.opportunity_owner
+	""".format(conditions=conditions, rate_table=rate_table)
+	
+	return frappe.db.sql(query, filters, as_dict=True)
 
 
 def get_conditions(filters):
@@ -121,6 +177,9 @@ def get_conditions(filters):
 	if filters.get("sales_person"):
 		conditions.append("opp.opportunity_owner = %(sales_person)s")
 	
+	if filters.get("company"):
+		conditions.append("opp.company = %(company)s")
+	
 	if filters.get("sales_stage"):
 		conditions.append("opp.sales_stage = %(sales_stage)s")
 	
@@ -137,23 +196,14 @@ def get_chart_data(data=None, filters=None):
 	if data is None:
 		if filters is None:
 			filters = {}
-		data = get_data(filters)
+		data = get_chart_aggregates(filters)
 	
 	# Group data by sales person
 	sales_person_data = {}
 	
 	for row in data:
 		sales_person = row.get('sales_person') or 'Not Assigned'
-		weighted_amount = row.get('weighted_amount', 0)
-		
-		# Extract numeric value from formatted currency
-		if isinstance(weighted_amount, str):
-			import re
-			numeric_value = re.sub(r'[^\d.-]', '', str(weighted_amount))
-			try:
-				weighted_amount = float(numeric_value) if numeric_value else 0
-			except ValueError:
-				weighted_amount = 0
+		weighted_amount = flt(row.get('base_weighted_amount'))
 		
 		if sales_person in sales_person_data:
 			sales_person_data[sales_person] += weighted_amount
@@ -184,11 +234,13 @@ def get_chart_data(data=None, filters=None):
 
 # Whitelisted method for dashboard chart
 @frappe.whitelist()
+@report_cache("Deal Based Forecast")
 def get_deal_based_forecast_chart(filters=None):
 	"""Whitelisted method for Deal Based Forecast chart"""
 	if not filters:
 		filters = {}
 	
-	data = get_data(filters)
-	chart = get_chart_data(data)
+	data = get_chart_aggregates(filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	return chart
@@ -37,6 +37,29 @@ frappe.query_reports["Deal Loss"] = {
 			"label": __("Lost Reason"),
 			"fieldtype": "Link",
 			"options": "Opportunity Lost Reason"
+		},
+		{
+			"fieldname": "view",
+			"label": __("View"),
+			"fieldtype": "Select",
+			"options": "Opportunities\nPareto",
+			"default": "Opportunities"
+		}
+	],
+	
+	"formatter": function(value, row, column, data, default_formatter) {
+		// Lost reasons come back as a list per opportunity
+		if (column.fieldname === "lost_reason" && Array.isArray(value)) {
+			value = value.join(", ");
+		}
+		
+		value = default_formatter(value, row, column, data);
+		
+		// Reason totals in the Pareto view
+		if (data && data.is_reason_total) {
+			value = `<b>${value}</b>`;
 		}
-	]
+		
+		return value;
+	}
 };
@@ -5,11 +5,34 @@ import frappe
 from frappe import _
 from frappe.utils import getdate, flt
 
+from crm_dashboards.crm_dashboards.exchange_rates import get_company_currency
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
 
+# Distinct lost reasons per opportunity with their count, so an opportunity lost for several
+# reasons can split its amount evenly between them and reason totals add up to the loss
+LOST_REASONS = """(
+	SELECT
+		detail.parent,
+		detail.lost_reason,
+		COUNT(*) OVER (PARTITION BY detail.parent) as reasons
+	FROM (
+		SELECT DISTINCT parent, lost_reason
+		FROM `tabOpportunity Lost Reason Detail`
+		WHERE parenttype = 'Opportunity'
+	) detail
+)"""
+
+
+@report_cache("Deal Loss")
 def execute(filters=None):
+	if filters.get("view") == "Pareto":
+		return execute_pareto(filters)
+	
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data)
+	with profile_section("chart"):
+		chart = get_chart_data(filters=filters)
 	
 	return columns, data, None, chart
 
@@ -46,6 +69,7 @@ def get_columns():
 			"fieldname": "lost_amount",
 			"label": _("Lost Amount"),
 			"fieldtype": "Currency",
+			"options": "currency",
 			"width": 150
 		},
 		{
@@ -53,6 +77,13 @@ def get_columns():
 			"label": _("Closing Date"),
 			"fieldtype": "Date",
 			"width": 150
+		},
+		{
+			"fieldname": "currency",
+			"label": _("Currency"),
+			"fieldtype": "Link",
+			"options": "Currency",
+			"width": 80
 		}
 	]
 
@@ -65,46 +96,230 @@ def get_data(filters):
 			opp.name as opportunity_name,
 			opp.customer_name as customer,
 			opp.opportunity_owner as sales_person,
-			GROUP_CONCAT(DISTINCT olr.lost_reason SEPARATOR ', ') as lost_reason,
 			opp.opportunity_amount as lost_amount,
-			opp.modified as closing_date,
+			opp.lost_date as closing_date,
 			opp.currency
 		FROM `tabOpportunity` opp
-		LEFT JOIN `tabOpportunity Lost Reason Detail` olr ON opp.name = olr.parent
 		WHERE opp.status = 'Lost'
 		AND opp.docstatus != 2
 		{conditions}
-		GROUP BY opp.name
-		ORDER BY opp.modified DESC
+		ORDER BY opp.lost_date DESC
 	""".format(conditions=conditions)
 	
 	data = frappe.db.sql(query, filters, as_dict=True)
 	
-	# Format currency fields
+	lost_reasons = get_lost_reasons([row.opportunity_name for row in data])
 	for row in data:
-		if row.get('lost_amount'):
-			row['lost_amount'] = frappe.format_value(row['lost_amount'], {
-				'fieldtype': 'Currency',
-				'currency': row.get('currency') or frappe.get_default('currency')
-			})
+		row.lost_reason = lost_reasons.get(row.opportunity_name, [])
 	
 	return data
 
 
+def get_lost_reasons(opportunities):
+	"""Lost reasons of each opportunity as a list, from one query over the child table"""
+	if not opportunities:
+		return {}
+	
+	lost_reasons = {}
+	for parent, lost_reason, _idx in frappe.db.sql("""
+		SELECT olr.parent, olr.lost_reason, MIN(olr.idx) as idx
+		FROM `tabOpportunity Lost Reason Detail` olr
+		WHERE olr.parenttype = 'Opportunity'
+		AND olr.parent IN %(opportunities)s
+		GROUP BY olr.parent, olr.lost_reason
+		ORDER BY olr.parent, idx
+	""", {"opportunities": opportunities}):
+		lost_reasons.setdefault(parent, []).append(lost_reason)
+	
+	return lost_reasons
+
+
+def get_chart_aggregates(filters):
+	"""Lost deals and lost amount (company currency) per reason, grouped in the database.
+	Amounts are split between reasons as in the Pareto view"""
+	conditions = get_conditions(filters)
+	
+	query = """
+		SELECT
+			COALESCE(olr.lost_reason, %(not_specified)s) as lost_reason,
+			COUNT(DISTINCT opp.name) as lost_deals,
+			SUM(opp.base_opportunity_amount / COALESCE(olr.reasons, 1)) as lost_amount
+		FROM `tabOpportunity` opp
+		LEFT JOIN {lost_reasons} olr ON olr.parent = opp.name
+		WHERE opp.status = 'Lost'
+		AND opp.docstatus != 2
+		{conditions}
+		GROUP BY COALESCE(olr.lost_reason, %(not_specified)s)
+		ORDER BY lost_deals DESC
+	""".format(lost_reasons=LOST_REASONS, conditions=conditions)
+	
+	return frappe.db.sql(query, dict(filters, not_specified=_("Not Specified")), as_dict=True)
+
+
+def execute_pareto(filters):
+	"""Lost value by reason x month x sales person, reasons ranked with cumulative Pareto shares"""
+	company_currency = get_company_currency(filters)
+	cells = get_loss_cube(filters)
+	
+	reasons = {}
+	for cell in cells:
+		reason = reasons.setdefault(cell.lost_reason, frappe._dict(lost_amount=0, lost_deals=0, cells=[]))
+		reason.lost_amount += flt(cell.lost_amount)
+		reason.lost_deals += cell.lost_deals
+		reason.cells.append(cell)
+	
+	total = sum(reason.lost_amount for reason in reasons.values())
+	ranked = sorted(reasons.items(), key=lambda item: item[1].lost_amount, reverse=True)
+	
+	data = []
+	cumulative = 0
+	for rank, (lost_reason, reason) in enumerate(ranked, start=1):
+		cumulative += reason.lost_amount
+		reason.rank = rank
+		reason.share = reason.lost_amount * 100 / total if total else 0
+		reason.cumulative_share = cumulative * 100 / total if total else 0
+		
+		data.append(frappe._dict(
+			lost_reason=lost_reason,
+			rank=rank,
+			lost_deals=reason.lost_deals,
+			lost_amount=reason.lost_amount,
+			share=reason.share,
+			cumulative_share=reason.cumulative_share,
+			company_currency=company_currency,
+			is_reason_total=1
+		))
+		
+		for cell in sorted(reason.cells, key=lambda cell: (cell.month_start, -flt(cell.lost_amount))):
+			data.append(frappe._dict(
+				lost_reason=lost_reason,
+				month=getdate(cell.month_start).strftime("%b %Y"),
+				sales_person=cell.sales_person,
+				lost_deals=cell.lost_deals,
+				lost_amount=flt(cell.lost_amount),
+				share=flt(cell.lost_amount) * 100 / total if total else 0,
+				company_currency=company_currency
+			))
+	
+	with profile_section("chart"):
+		chart = get_pareto_chart(ranked)
+	
+	return get_pareto_columns(), data, None, chart
+
+
+def get_loss_cube(filters):
+	"""One grouped query over lost opportunities and their reasons, see LOST_REASONS"""
+	conditions = get_conditions(filters)
+	
+	query = """
+		SELECT
+			COALESCE(olr.lost_reason, %(not_specified)s) as lost_reason,
+			DATE_SUB(opp.lost_date, INTERVAL DAYOFMONTH(opp.lost_date) - 1 DAY) as month_start,
+			opp.opportunity_owner as sales_person,
+			COUNT(DISTINCT opp.name) as lost_deals,
+			SUM(opp.base_opportunity_amount / COALESCE(olr.reasons, 1)) as lost_amount
+		FROM `tabOpportunity` opp
+		LEFT JOIN {lost_reasons} olr ON olr.parent = opp.name
+		WHERE opp.status = 'Lost'
+		AND opp.docstatus != 2
+		AND opp.lost_date IS NOT NULL
+		{conditions}
+		GROUP BY lost_reason, month_start, sales_person
+	""".format(lost_reasons=LOST_REASONS, conditions=conditions)
+	
+	return frappe.db.sql(query, dict(filters, not_specified=_("Not Specified")), as_dict=True)
+
+
+def get_pareto_columns():
+	return [
+		{
+			"fieldname": "lost_reason",
+			"label": _("Lost Reason"),
+			"fieldtype": "Data",
+			"width": 200
+		},
+		{
+			"fieldname": "rank",
+			"label": _("Rank"),
+			"fieldtype": "Int",
+			"width": 70
+		},
+		{
+			"fieldname": "month",
+			"label": _("Month"),
+			"fieldtype": "Data",
+			"width": 100
+		},
+		{
+			"fieldname": "sales_person",
+			"label": _("Sales Person"),
+			"fieldtype": "Link",
+			"options": "User",
+			"width": 150
+		},
+		{
+			"fieldname": "lost_deals",
+			"label": _("Lost Deals"),
+			"fieldtype": "Int",
+			"width": 100
+		},
+		{
+			"fieldname": "lost_amount",
+			"label": _("Lost Amount"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 150
+		},
+		{
+			"fieldname": "share",
+			"label": _("Share"),
+			"fieldtype": "Percent",
+			"width": 90
+		},
+		{
+			"fieldname": "cumulative_share",
+			"label": _("Cumulative Share"),
+			"fieldtype": "Percent",
+			"width": 130
+		}
+	]
+
+
+def get_pareto_chart(ranked):
+	"""Lost amount per reason, largest first"""
+	return {
+		"data": {
+			"labels": [lost_reason for lost_reason, _reason in ranked],
+			"datasets": [{
+				"name": "Lost Amount",
+				"values": [reason.lost_amount for _lost_reason, reason in ranked]
+			}]
+		},
+		"type": "bar",
+		"fieldtype": "Currency",
+		"colors": ["#ff5858"]
+	}
+
+
 def get_conditions(filters):
 	conditions = []
 	
 	if filters.get("from_date"):
-		conditions.append("DATE(opp.modified) >= %(from_date)s")
+		conditions.append("opp.lost_date >= %(from_date)s")
 	
 	if filters.get("to_date"):
-		conditions.append("DATE(opp.modified) <= %(to_date)s")
+		conditions.append("opp.lost_date <= %(to_date)s")
 	
 	if filters.get("sales_person"):
 		conditions.append("opp.opportunity_owner = %(sales_person)s")
 	
 	if filters.get("lost_reason"):
-		conditions.append("olr.lost_reason = %(lost_reason)s")
+		conditions.append("""EXISTS (
+			SELECT 1 FROM `tabOpportunity Lost Reason Detail` reason
+			WHERE reason.parent = opp.name
+			AND reason.parenttype = 'Opportunity'
+			AND reason.lost_reason = %(lost_reason)s
+		)""")
 	
 	if conditions:
 		return "AND " + " AND ".join(conditions)
@@ -119,32 +334,14 @@ def get_chart_data(data=None, filters=None):
 	if data is None:
 		if filters is None:
 			filters = {}
-		data = get_data(filters)
-	
-	# Count lost deals by reason
-	reason_counts = {}
-	
-	for row in data:
-		lost_reasons = row.get('lost_reason', 'Not Specified')
-		if lost_reasons and lost_reasons != 'Not Specified':
-			# Split multiple reasons and count each
-			reasons = [reason.strip() for reason in lost_reasons.split(',')]
-			for reason in reasons:
-				if reason:
-					reason_counts[reason] = reason_counts.get(reason, 0) + 1
-		else:
-			reason_counts['Not Specified'] = reason_counts.get('Not Specified', 0) + 1
-	
-	# Prepare chart data
-	labels = list(reason_counts.keys())
-	values = list(reason_counts.values())
+		data = get_chart_aggregates(filters)
 	
 	chart_data = {
 		"data": {
-			"labels": labels,
+			"labels": [row.get('lost_reason') for row in data],
 			"datasets": [{
 				"name": "Lost Deals",
-				"values": values
+				"values": [row.get('lost_deals') for row in data]
 			}]
 		},
 		"type": "pie",
@@ -154,13 +351,43 @@ def get_chart_data(data=None, filters=None):
 	return chart_data
 
 
+def get_lost_amount_chart_data(data):
+	"""Prepare chart data for Lost Amount by Reason"""
+	return {
+		"data": {
+			"labels": [row.get('lost_reason') for row in data],
+			"datasets": [{
+				"name": "Lost Amount",
+				"values": [flt(row.get('lost_amount')) for row in data]
+			}]
+		},
+		"type": "bar",
+		"fieldtype": "Currency",
+		"colors": ["#ff5858"]
+	}
+
+
 # Whitelisted method for dashboard chart
 @frappe.whitelist()
+@report_cache("Deal Loss")
 def get_deal_loss_analysis_chart(filters=None):
 	"""Whitelisted method for Deal Loss Analysis chart"""
 	if not filters:
 		filters = {}
 	
-	data = get_data(filters)
-	chart = get_chart_data(data)
+	data = get_chart_aggregates(filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	return chart
+
+
+@frappe.whitelist()
+@report_cache("Deal Loss")
+def get_lost_amount_by_reason_chart(filters=None):
+	"""Whitelisted method for a Lost Amount by Reason chart"""
+	if not filters:
+		filters = {}
+	
+	data = get_chart_aggregates(filters)
+	with profile_section("chart"):
+		return get_lost_amount_chart_data(data)
@@ -5,11 +5,16 @@ import frappe
 from frappe import _
 from frappe.utils import getdate, add_months, get_first_day, get_last_day, flt
 
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
 
+
+@report_cache("Monthly Sales Report (Salesperson-wise)")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	
 	return columns, data, None, chart
 
@@ -221,11 +226,13 @@ def get_chart_data(data=None, filters=None):
 
 # Whitelisted method for dashboard chart
 @frappe.whitelist()
+@report_cache("Monthly Sales Report (Salesperson-wise)")
 def get_monthly_sales_chart(filters=None):
 	"""Whitelisted method for Monthly Sales Salesperson Wise chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_chart_data(data)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	return chart
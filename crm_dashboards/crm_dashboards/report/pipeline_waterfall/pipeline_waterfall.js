@@ -0,0 +1,36 @@
+// Copyright (c) 2025, Meghwin Dave and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Pipeline Waterfall"] = {
+	"chart": true,
+	"filters": [
+		{
+			"fieldname": "from_date",
+			"label": __("From Snapshot"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.add_days(frappe.datetime.get_today(), -7),
+			"reqd": 1
+		},
+		{
+			"fieldname": "to_date",
+			"label": __("To Snapshot"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.get_today(),
+			"reqd": 1
+		},
+		{
+			"fieldname": "sales_person",
+			"label": __("Sales Person"),
+			"fieldtype": "Link",
+			"options": "User",
+			"get_query": function() {
+				return {
+					"filters": {
+						"enabled": 1,
+						"user_type": "System User"
+					}
+				};
+			}
+		}
+	]
+};
@@ -0,0 +1,160 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, flt, getdate, today
+
+from crm_dashboards.crm_dashboards.doctype.opportunity_pipeline_snapshot.opportunity_pipeline_snapshot import (
+	REMOVED_STATUS,
+	get_pipeline_state,
+)
+from crm_dashboards.crm_dashboards.pipeline import OPEN_STATUSES
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
+
+WON_STATUSES = ("Converted",)
+
+
+@report_cache("Pipeline Waterfall")
+def execute(filters=None):
+	columns = get_columns()
+	data = get_data(filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
+
+	return columns, data, None, chart
+
+
+def get_columns():
+	return [
+		{"fieldname": "bucket", "label": _("Bucket"), "fieldtype": "Data", "width": 200},
+		{"fieldname": "opportunities", "label": _("Opportunities"), "fieldtype": "Int", "width": 120},
+		{"fieldname": "amount", "label": _("Pipeline Change"), "fieldtype": "Currency", "width": 160},
+	]
+
+
+def get_data(filters):
+	"""Pipeline movement between two dates. Both states cover every opportunity, so one that
+	left a sales person's pipeline is classed by what happened to it rather than counted as lost"""
+	from_date = getdate(filters.get("from_date") or add_days(today(), -7))
+	to_date = getdate(filters.get("to_date") or today())
+	owner = filters.get("sales_person")
+
+	before = get_pipeline_state(from_date)
+	after = get_pipeline_state(to_date)
+
+	def is_open(rows, name):
+		row = rows.get(name)
+		return bool(row and row.status in OPEN_STATUSES and (not owner or row.opportunity_owner == owner))
+
+	open_before = {name for name in before if is_open(before, name)}
+	open_after = {name for name in after if is_open(after, name)}
+	still_open = open_before & open_after
+
+	removed, reassigned_out, won, lost, closed = set(), set(), set(), set(), set()
+	for name in open_before - open_after:
+		row = after.get(name)
+		if not row or row.status == REMOVED_STATUS:
+			removed.add(name)
+		elif owner and row.opportunity_owner != owner:
+			reassigned_out.add(name)
+		elif row.status in WON_STATUSES:
+			won.add(name)
+		elif row.status == "Lost":
+			lost.add(name)
+		else:
+			closed.add(name)
+
+	reassigned_in = {
+		name
+		for name in open_after - open_before
+		if owner and name in before and before[name].status in OPEN_STATUSES
+	}
+	new = open_after - open_before - reassigned_in
+
+	changes = {name: flt(after[name].amount) - flt(before[name].amount) for name in still_open}
+	increased = {name for name, change in changes.items() if change > 0}
+	decreased = {name for name, change in changes.items() if change < 0}
+	slipped = {
+		name
+		for name in still_open
+		if after[name].expected_closing
+		and before[name].expected_closing
+		and getdate(after[name].expected_closing) > getdate(before[name].expected_closing)
+	}
+
+	def total(rows, names):
+		return sum(flt(rows[name].amount) for name in names)
+
+	data = [
+		get_row(_("Starting Pipeline"), open_before, total(before, open_before)),
+		get_row(_("New"), new, total(after, new)),
+	]
+
+	if owner:
+		data.append(get_row(_("Reassigned In"), reassigned_in, total(after, reassigned_in)))
+
+	data.extend(
+		[
+			get_row(_("Increased"), increased, sum(changes[name] for name in increased)),
+			get_row(_("Decreased"), decreased, sum(changes[name] for name in decreased)),
+			get_row(_("Won"), won, -total(before, won)),
+			get_row(_("Lost"), lost, -total(before, lost)),
+			get_row(_("Closed"), closed, -total(before, closed)),
+		]
+	)
+
+	if owner:
+		data.append(get_row(_("Reassigned Out"), reassigned_out, -total(before, reassigned_out)))
+
+	data.extend(
+		[
+			get_row(_("Removed"), removed, -total(before, removed)),
+			get_row(_("Ending Pipeline"), open_after, total(after, open_after)),
+			# Slipped deals stay in the pipeline, so they are reported without moving the total
+			get_row(_("Slipped (Close Date Moved Out)"), slipped, total(after, slipped), is_memo=1),
+		]
+	)
+
+	return data
+
+
+def get_row(bucket, names, amount, is_memo=0):
+	return frappe._dict(bucket=bucket, opportunities=len(names), amount=amount, is_memo=is_memo)
+
+
+def get_chart_data(data=None, filters=None):
+	"""Bar chart of pipeline movement between the two snapshots"""
+
+	# If called from dashboard without parameters, get data ourselves
+	if data is None:
+		if filters is None:
+			filters = {}
+		data = get_data(filters)
+
+	rows = [row for row in data if not row.is_memo]
+
+	return {
+		"data": {
+			"labels": [row.bucket for row in rows],
+			"datasets": [{"name": "Pipeline Change", "values": [row.amount for row in rows]}],
+		},
+		"type": "bar",
+		"colors": ["#5e64ff"],
+		"fieldtype": "Currency",
+	}
+
+
+# Whitelisted method for dashboard chart
+@frappe.whitelist()
+@report_cache("Pipeline Waterfall")
+def get_pipeline_waterfall_chart(filters=None):
+	"""Whitelisted method for Pipeline Waterfall chart"""
+	if not filters:
+		filters = {}
+
+	data = get_data(filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
+	return chart
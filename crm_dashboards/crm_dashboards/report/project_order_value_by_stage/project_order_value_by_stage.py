@@ -5,11 +5,16 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate, today, add_days
 
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
 
+
+@report_cache("Project Order Value by Stage")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data, filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data, filters)
 	return columns, data, None, chart
 
 
@@ -5,11 +5,16 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate, today, add_days
 
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
 
+
+@report_cache("Project Tracker")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data, filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data, filters)
 	return columns, data, None, chart
 
 
@@ -320,35 +325,41 @@ def get_chart_data(data, filters):
 
 # Whitelisted methods for dashboard charts
 @frappe.whitelist()
+@report_cache("Project Tracker")
 def get_projects_by_stage_funnel(filters=None):
 	"""Whitelisted method for Projects by Stage Funnel chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_funnel_chart(data)
+	with profile_section("chart"):
+		chart = get_funnel_chart(data)
 	return chart
 
 
 @frappe.whitelist()
+@report_cache("Project Tracker")
 def get_project_order_value_by_stage(filters=None):
 	"""Whitelisted method for Project Order Value by Stage chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_order_value_chart(data)
+	with profile_section("chart"):
+		chart = get_order_value_chart(data)
 	return chart
 
 
 @frappe.whitelist()
+@report_cache("Project Tracker")
 def get_visit_timeline_chart(filters=None):
 	"""Whitelisted method for Visit Timeline Chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_timeline_chart(data)
+	with profile_section("chart"):
+		chart = get_timeline_chart(data)
 	return chart
 
 
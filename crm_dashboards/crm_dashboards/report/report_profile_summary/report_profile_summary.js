@@ -0,0 +1,33 @@
+// Copyright (c) 2025, Meghwin Dave and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Report Profile Summary"] = {
+	"chart": true,
+	"filters": [
+		{
+			"fieldname": "from_date",
+			"label": __("From Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.add_days(frappe.datetime.get_today(), -7),
+			"reqd": 1
+		},
+		{
+			"fieldname": "to_date",
+			"label": __("To Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.get_today(),
+			"reqd": 1
+		},
+		{
+			"fieldname": "report_name",
+			"label": __("Report"),
+			"fieldtype": "Data"
+		},
+		{
+			"fieldname": "group_by_filter_shape",
+			"label": __("Split by Filter Shape"),
+			"fieldtype": "Check",
+			"default": 1
+		}
+	]
+};
@@ -0,0 +1,153 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+from collections import defaultdict
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import add_days, cint, flt, getdate, today
+
+CHART_ROWS = 10
+
+
+def execute(filters=None):
+	if not filters:
+		filters = {}
+
+	filters = frappe._dict(
+		filters,
+		from_date=getdate(filters.get("from_date") or add_days(today(), -7)),
+		to_date=getdate(filters.get("to_date") or today()),
+	)
+
+	columns = get_columns(filters)
+	data = get_data(filters)
+	chart = get_chart_data(data)
+
+	return columns, data, None, chart
+
+
+def get_columns(filters):
+	columns = [
+		{"fieldname": "report_name", "label": _("Report"), "fieldtype": "Data", "width": 200},
+		{"fieldname": "method", "label": _("Method"), "fieldtype": "Data", "width": 180},
+	]
+
+	if cint(filters.get("group_by_filter_shape", 1)):
+		columns.append(
+			{"fieldname": "filter_shape", "label": _("Filter Shape"), "fieldtype": "Data", "width": 200}
+		)
+
+	for fieldname, label, fieldtype in (
+		("runs", _("Runs"), "Int"),
+		("p50_ms", _("p50 (ms)"), "Float"),
+		("p95_ms", _("p95 (ms)"), "Float"),
+		("p95_db_ms", _("p95 Database (ms)"), "Float"),
+		("p95_python_ms", _("p95 Python (ms)"), "Float"),
+		("p95_chart_ms", _("p95 Chart (ms)"), "Float"),
+		("avg_queries", _("Avg SQL Statements"), "Float"),
+		("avg_rows", _("Avg Rows"), "Float"),
+		("avg_payload_kb", _("Avg Payload (KB)"), "Float"),
+	):
+		columns.append({"fieldname": fieldname, "label": label, "fieldtype": fieldtype, "width": 110})
+
+	return columns
+
+
+def get_data(filters):
+	"""Latency percentiles per report, method and (optionally) filter shape"""
+	conditions = get_conditions(filters)
+
+	logs = frappe.db.sql(
+		f"""
+		SELECT
+			log.report_name,
+			log.method,
+			log.filter_shape,
+			log.total_ms,
+			log.db_ms,
+			log.python_ms,
+			log.chart_ms,
+			log.query_count,
+			log.row_count,
+			log.payload_bytes
+		FROM `tabReport Profile Log` log
+		WHERE log.creation >= %(from_date)s
+		AND log.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+		{conditions}
+	""",
+		filters,
+		as_dict=True,
+	)
+
+	split_by_shape = cint(filters.get("group_by_filter_shape", 1))
+	groups = defaultdict(list)
+	for log in logs:
+		groups[(log.report_name, log.method, log.filter_shape if split_by_shape else None)].append(log)
+
+	data = []
+	for (report_name, method, filter_shape), runs in groups.items():
+		values = {
+			field: np.array([flt(run[field]) for run in runs])
+			for field in (
+				"total_ms",
+				"db_ms",
+				"python_ms",
+				"chart_ms",
+				"query_count",
+				"row_count",
+				"payload_bytes",
+			)
+		}
+
+		data.append(
+			frappe._dict(
+				report_name=report_name,
+				method=method,
+				filter_shape=filter_shape,
+				runs=len(runs),
+				p50_ms=flt(np.percentile(values["total_ms"], 50), 1),
+				p95_ms=flt(np.percentile(values["total_ms"], 95), 1),
+				p95_db_ms=flt(np.percentile(values["db_ms"], 95), 1),
+				p95_python_ms=flt(np.percentile(values["python_ms"], 95), 1),
+				p95_chart_ms=flt(np.percentile(values["chart_ms"], 95), 1),
+				avg_queries=flt(values["query_count"].mean(), 1),
+				avg_rows=flt(values["row_count"].mean(), 1),
+				avg_payload_kb=flt(values["payload_bytes"].mean() / 1024, 1),
+			)
+		)
+
+	return sorted(data, key=lambda row: row.p95_ms, reverse=True)
+
+
+def get_conditions(filters):
+	conditions = []
+
+	if filters.get("report_name"):
+		conditions.append("log.report_name = %(report_name)s")
+
+	if conditions:
+		return "AND " + " AND ".join(conditions)
+	else:
+		return ""
+
+
+def get_chart_data(data):
+	"""p50 and p95 of the slowest report methods"""
+	rows = data[:CHART_ROWS]
+
+	return {
+		"data": {
+			"labels": [
+				f"{row.report_name}: {row.method}" + (f" ({row.filter_shape})" if row.filter_shape else "")
+				for row in rows
+			],
+			"datasets": [
+				{"name": _("p50 (ms)"), "values": [row.p50_ms for row in rows]},
+				{"name": _("p95 (ms)"), "values": [row.p95_ms for row in rows]},
+			],
+		},
+		"type": "bar",
+		"colors": ["#5e64ff", "#ff5858"],
+	}
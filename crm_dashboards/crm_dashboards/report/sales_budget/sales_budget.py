@@ -6,11 +6,16 @@ from frappe import _
 from frappe.utils import getdate, add_months, get_first_day, get_last_day, flt
 from erpnext.accounts.utils import get_fiscal_year
 
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
 
+
+@report_cache("Sales Budget")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	
 	return columns, data, None, chart
 
@@ -247,11 +252,13 @@ def get_chart_data(data=None, filters=None):
 
 # Whitelisted method for dashboard chart
 @frappe.whitelist()
+@report_cache("Sales Budget")
 def get_sales_budget_vs_actual(filters=None):
 	"""Whitelisted method for Sales Budget vs Actual chart"""
 	if not filters:
 		filters = {}
 	
 	data = get_data(filters)
-	chart = get_chart_data(data)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
 	return chart
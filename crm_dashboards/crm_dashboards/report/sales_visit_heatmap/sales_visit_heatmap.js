@@ -0,0 +1,48 @@
+// Copyright (c) 2025, Meghwin Dave and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Sales Visit Heatmap"] = {
+	"chart": true,
+	"filters": [
+		{
+			"fieldname": "from_date",
+			"label": __("From Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.add_days(frappe.datetime.add_months(frappe.datetime.get_today(), -12), 1),
+			"reqd": 1
+		},
+		{
+			"fieldname": "to_date",
+			"label": __("To Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.get_today(),
+			"reqd": 1
+		},
+		{
+			"fieldname": "sales_person",
+			"label": __("Sales Person"),
+			"fieldtype": "Link",
+			"options": "Sales Person",
+			"get_query": function() {
+				return {
+					"filters": {
+						"enabled": 1
+					}
+				};
+			}
+		},
+		{
+			"fieldname": "outcome",
+			"label": __("Outcome"),
+			"fieldtype": "Select",
+			"options": "\nSuccessful\nPartially Successful\nUnsuccessful\nFollow-up Required"
+		},
+		{
+			"fieldname": "group_by",
+			"label": __("Group By"),
+			"fieldtype": "Select",
+			"options": "Sales Person\nOutcome",
+			"default": "Sales Person"
+		}
+	]
+};
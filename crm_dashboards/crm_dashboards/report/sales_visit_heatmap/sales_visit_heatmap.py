@@ -0,0 +1,154 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, add_months, getdate, today
+
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+GROUP_BY_FIELDS = {
+	"Sales Person": "svl.sales_person",
+	"Outcome": "svl.outcome_of_meeting",
+}
+
+
+@report_cache("Sales Visit Heatmap")
+def execute(filters=None):
+	if not filters:
+		filters = {}
+
+	# The dashboard chart runs without dates, default to the calendar year the heatmap shows
+	filters = frappe._dict(
+		filters,
+		from_date=filters.get("from_date") or add_days(add_months(today(), -12), 1),
+		to_date=filters.get("to_date") or today(),
+	)
+
+	columns = get_columns(filters)
+	cells = get_visit_counts(filters)
+	data = get_matrix(cells)
+	with profile_section("chart"):
+		chart = get_chart_data(cells, filters)
+
+	return columns, data, None, chart
+
+
+def get_columns(filters):
+	columns = [
+		{
+			"fieldname": "group_value",
+			"label": _(filters.get("group_by") or "Sales Person"),
+			"fieldtype": "Data",
+			"width": 180,
+		},
+		{"fieldname": "week", "label": _("Week"), "fieldtype": "Data", "width": 100},
+		{"fieldname": "week_start", "label": _("Week Starting"), "fieldtype": "Date", "width": 110},
+	]
+
+	for weekday in WEEKDAYS:
+		columns.append({"fieldname": weekday, "label": _(weekday.title()), "fieldtype": "Int", "width": 60})
+
+	columns.append({"fieldname": "total", "label": _("Total"), "fieldtype": "Int", "width": 80})
+
+	return columns
+
+
+def get_visit_counts(filters):
+	"""Visits per group, week and day of week, in one aggregation over Sales Visit Log"""
+	conditions = get_conditions(filters)
+	group_field = GROUP_BY_FIELDS.get(filters.get("group_by")) or GROUP_BY_FIELDS["Sales Person"]
+
+	query = f"""
+		SELECT
+			{group_field} as group_value,
+			DATE_SUB(svl.date_of_visit, INTERVAL WEEKDAY(svl.date_of_visit) DAY) as week_start,
+			WEEKDAY(svl.date_of_visit) as weekday,
+			COUNT(svl.name) as visits
+		FROM `tabSales Visit Log` svl
+		WHERE svl.docstatus = 1
+		{conditions}
+		GROUP BY group_value, week_start, weekday
+		ORDER BY group_value, week_start
+	"""
+
+	return frappe.db.sql(query, filters, as_dict=True)
+
+
+def get_matrix(cells):
+	"""One row per group and week with a visit count for each day of the week"""
+	rows = {}
+
+	for cell in cells:
+		week_start = getdate(cell.week_start)
+		key = (cell.group_value, week_start)
+
+		if key not in rows:
+			year, week, _weekday = week_start.isocalendar()
+			rows[key] = frappe._dict(
+				group_value=cell.group_value or _("Not Set"),
+				week=f"{year}-W{week:02d}",
+				week_start=week_start,
+				total=0,
+				**{weekday: 0 for weekday in WEEKDAYS},
+			)
+
+		rows[key][WEEKDAYS[cell.weekday]] += cell.visits
+		rows[key].total += cell.visits
+
+	return list(rows.values())
+
+
+def get_conditions(filters):
+	conditions = []
+
+	if filters.get("from_date"):
+		conditions.append("svl.date_of_visit >= %(from_date)s")
+
+	if filters.get("to_date"):
+		conditions.append("svl.date_of_visit <= %(to_date)s")
+
+	if filters.get("sales_person"):
+		conditions.append("svl.sales_person = %(sales_person)s")
+
+	if filters.get("outcome"):
+		conditions.append("svl.outcome_of_meeting = %(outcome)s")
+
+	if conditions:
+		return "AND " + " AND ".join(conditions)
+	else:
+		return ""
+
+
+def get_chart_data(cells, filters):
+	"""Calendar heatmap of visits per day across the selected groups"""
+	data_points = {}
+
+	for cell in cells:
+		day = add_days(getdate(cell.week_start), cell.weekday)
+		timestamp = str(int(time.mktime(day.timetuple())))
+		data_points[timestamp] = data_points.get(timestamp, 0) + cell.visits
+
+	return {
+		"data": {
+			"dataPoints": data_points,
+			"start": getdate(filters.get("from_date")),
+			"end": getdate(filters.get("to_date")),
+		},
+		"type": "heatmap",
+		"countLabel": _("Visits"),
+		"discreteDomains": 1,
+	}
+
+
+# Whitelisted method for dashboard chart
+@frappe.whitelist()
+def get_sales_visit_heatmap(filters=None):
+	"""Whitelisted method for Sales Visit Heatmap chart"""
+	filters = frappe._dict(frappe.parse_json(filters or "{}"))
+	return execute(filters)[3]
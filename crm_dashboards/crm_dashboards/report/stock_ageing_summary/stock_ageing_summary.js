@@ -0,0 +1,48 @@
+// Copyright (c) 2025, Meghwin Dave and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Stock Ageing Summary"] = {
+	"chart": true,
+	"filters": [
+		{
+			"fieldname": "company",
+			"label": __("Company"),
+			"fieldtype": "Link",
+			"options": "Company",
+			"default": frappe.defaults.get_user_default("Company"),
+			"reqd": 1
+		},
+		{
+			"fieldname": "warehouse",
+			"label": __("Warehouse"),
+			"fieldtype": "Link",
+			"options": "Warehouse",
+			"get_query": function() {
+				return {
+					"filters": {
+						"company": frappe.query_report.get_filter_value("company")
+					}
+				};
+			}
+		},
+		{
+			"fieldname": "item_group",
+			"label": __("Item Group"),
+			"fieldtype": "Link",
+			"options": "Item Group"
+		},
+		{
+			"fieldname": "item_code",
+			"label": __("Item"),
+			"fieldtype": "Link",
+			"options": "Item"
+		},
+		{
+			"fieldname": "range",
+			"label": __("Ageing Range (Days)"),
+			"fieldtype": "Data",
+			"default": "30, 60, 90",
+			"reqd": 1
+		}
+	]
+};
@@ -0,0 +1,199 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint, date_diff, flt, getdate, today
+
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
+
+DEFAULT_RANGES = "30, 60, 90"
+
+
+@report_cache("Stock Ageing Summary")
+def execute(filters=None):
+	if not filters:
+		filters = {}
+
+	ranges = get_ranges(filters)
+	columns = get_columns(ranges)
+	data = get_data(filters, ranges)
+	with profile_section("chart"):
+		chart = get_chart_data(data, ranges)
+
+	return columns, data, None, chart
+
+
+def get_ranges(filters):
+	"""Upper bounds in days of every age bucket but the last, which is open ended"""
+	ranges = sorted(
+		{cint(value) for value in (filters.get("range") or DEFAULT_RANGES).split(",") if cint(value) > 0}
+	)
+	return ranges or [cint(value) for value in DEFAULT_RANGES.split(",")]
+
+
+def get_range_labels(ranges):
+	labels, lower = [], 0
+	for upper in ranges:
+		labels.append(f"{lower}-{upper}")
+		lower = upper + 1
+	labels.append(f"{ranges[-1]}+")
+	return labels
+
+
+def get_columns(ranges):
+	columns = [
+		{"fieldname": "item_code", "label": _("Item"), "fieldtype": "Link", "options": "Item", "width": 140},
+		{"fieldname": "item_name", "label": _("Item Name"), "fieldtype": "Data", "width": 160},
+		{
+			"fieldname": "warehouse",
+			"label": _("Warehouse"),
+			"fieldtype": "Link",
+			"options": "Warehouse",
+			"width": 140,
+		},
+		{"fieldname": "qty", "label": _("Qty"), "fieldtype": "Float", "width": 90},
+		{"fieldname": "stock_value", "label": _("Stock Value"), "fieldtype": "Currency", "width": 120},
+		{"fieldname": "average_age", "label": _("Average Age"), "fieldtype": "Float", "width": 100},
+	]
+
+	for idx, label in enumerate(get_range_labels(ranges)):
+		columns.extend(
+			[
+				{
+					"fieldname": f"range_{idx}_qty",
+					"label": _("Qty ({0} Days)").format(label),
+					"fieldtype": "Float",
+					"width": 110,
+				},
+				{
+					"fieldname": f"range_{idx}_value",
+					"label": _("Value ({0} Days)").format(label),
+					"fieldtype": "Currency",
+					"width": 120,
+				},
+			]
+		)
+
+	return columns
+
+
+def get_data(filters, ranges):
+	"""Age buckets from the saved FIFO queues, valued at the Bin's valuation rate"""
+	conditions = get_conditions(filters)
+
+	query = f"""
+		SELECT
+			state.item_code,
+			item.item_name,
+			state.warehouse,
+			state.qty,
+			state.fifo_queue,
+			IFNULL(bin.valuation_rate, 0) as valuation_rate
+		FROM `tabStock Ageing State` state
+		INNER JOIN `tabItem` item ON item.name = state.item_code
+		LEFT JOIN `tabBin` bin ON bin.item_code = state.item_code AND bin.warehouse = state.warehouse
+		WHERE state.qty > 0
+		{conditions}
+		ORDER BY state.item_code, state.warehouse
+	"""
+
+	as_of = getdate(today())
+	data = []
+
+	for row in frappe.db.sql(query, filters, as_dict=True):
+		buckets = [0.0] * (len(ranges) + 1)
+		weighted_age = 0.0
+
+		for qty, posting_date in json.loads(row.fifo_queue or "[]"):
+			if qty <= 0:
+				continue
+
+			age = date_diff(as_of, posting_date)
+			buckets[get_bucket(age, ranges)] += qty
+			weighted_age += qty * age
+
+		in_buckets = sum(buckets)
+		entry = frappe._dict(
+			item_code=row.item_code,
+			item_name=row.item_name,
+			warehouse=row.warehouse,
+			qty=row.qty,
+			stock_value=flt(row.qty * row.valuation_rate),
+			average_age=flt(weighted_age / in_buckets, 1) if in_buckets else 0,
+		)
+
+		for idx, qty in enumerate(buckets):
+			entry[f"range_{idx}_qty"] = qty
+			entry[f"range_{idx}_value"] = flt(qty * row.valuation_rate)
+
+		data.append(entry)
+
+	return data
+
+
+def get_bucket(age, ranges):
+	for idx, upper in enumerate(ranges):
+		if age <= upper:
+			return idx
+	return len(ranges)
+
+
+def get_conditions(filters):
+	conditions = []
+
+	if filters.get("company"):
+		conditions.append("state.company = %(company)s")
+
+	if filters.get("item_code"):
+		conditions.append("state.item_code = %(item_code)s")
+
+	if filters.get("item_group"):
+		conditions.append("""item.item_group IN (
+			SELECT ig.name FROM `tabItem Group` ig, `tabItem Group` parent
+			WHERE parent.name = %(item_group)s AND ig.lft >= parent.lft AND ig.rgt <= parent.rgt
+		)""")
+
+	if filters.get("warehouse"):
+		conditions.append("""state.warehouse IN (
+			SELECT wh.name FROM `tabWarehouse` wh, `tabWarehouse` parent
+			WHERE parent.name = %(warehouse)s AND wh.lft >= parent.lft AND wh.rgt <= parent.rgt
+		)""")
+
+	if conditions:
+		return "AND " + " AND ".join(conditions)
+	else:
+		return ""
+
+
+def get_chart_data(data, ranges):
+	"""Stock value per age bucket"""
+	values = [flt(sum(row[f"range_{idx}_value"] for row in data), 2) for idx in range(len(ranges) + 1)]
+
+	return {
+		"data": {
+			"labels": [_("{0} Days").format(label) for label in get_range_labels(ranges)],
+			"datasets": [{"name": _("Stock Value"), "values": values}],
+		},
+		"type": "bar",
+		"fieldtype": "Currency",
+		"colors": ["#5e64ff"],
+	}
+
+
+# Whitelisted method for dashboard chart
+@frappe.whitelist()
+@report_cache("Stock Ageing Summary")
+def get_stock_ageing_chart(filters=None):
+	"""Whitelisted method for Stock Ageing chart"""
+	if not filters:
+		filters = {}
+
+	filters = frappe._dict(frappe.parse_json(filters))
+	ranges = get_ranges(filters)
+	data = get_data(filters, ranges)
+	with profile_section("chart"):
+		return get_chart_data(data, ranges)
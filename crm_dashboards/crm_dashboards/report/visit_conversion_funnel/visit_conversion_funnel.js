@@ -0,0 +1,47 @@
+// Copyright (c) 2025, Meghwin Dave and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Visit Conversion Funnel"] = {
+	"chart": true,
+	"filters": [
+		{
+			"fieldname": "from_date",
+			"label": __("From Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.add_months(frappe.datetime.get_today(), -12),
+			"reqd": 1
+		},
+		{
+			"fieldname": "to_date",
+			"label": __("To Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.get_today(),
+			"reqd": 1
+		},
+		{
+			"fieldname": "sales_person",
+			"label": __("Sales Person"),
+			"fieldtype": "Link",
+			"options": "Sales Person",
+			"get_query": function() {
+				return {
+					"filters": {
+						"enabled": 1
+					}
+				};
+			}
+		},
+		{
+			"fieldname": "opportunity_window",
+			"label": __("Opportunity Window (Days)"),
+			"fieldtype": "Int",
+			"default": 90
+		},
+		{
+			"fieldname": "invoice_window",
+			"label": __("Invoice Window (Days)"),
+			"fieldtype": "Int",
+			"default": 180
+		}
+	]
+};
@@ -0,0 +1,213 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
+
+DEFAULT_OPPORTUNITY_WINDOW = 90
+DEFAULT_INVOICE_WINDOW = 180
+
+
+@report_cache("Visit Conversion Funnel")
+def execute(filters=None):
+	if not filters:
+		filters = {}
+
+	filters = frappe._dict(
+		filters,
+		opportunity_window=cint(filters.get("opportunity_window")) or DEFAULT_OPPORTUNITY_WINDOW,
+		invoice_window=cint(filters.get("invoice_window")) or DEFAULT_INVOICE_WINDOW,
+	)
+
+	columns = get_columns()
+	data = get_data(filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data)
+
+	return columns, data, None, chart
+
+
+def get_columns():
+	return [
+		{
+			"fieldname": "sales_person",
+			"label": _("Sales Person"),
+			"fieldtype": "Link",
+			"options": "Sales Person",
+			"width": 160,
+		},
+		{"fieldname": "visits", "label": _("Visits"), "fieldtype": "Int", "width": 80},
+		{"fieldname": "visited_customers", "label": _("Visited Customers"), "fieldtype": "Int", "width": 130},
+		{
+			"fieldname": "opportunity_customers",
+			"label": _("Customers with Opportunity"),
+			"fieldtype": "Int",
+			"width": 180,
+		},
+		{"fieldname": "opportunities", "label": _("Opportunities"), "fieldtype": "Int", "width": 110},
+		{
+			"fieldname": "opportunity_amount",
+			"label": _("Opportunity Amount"),
+			"fieldtype": "Currency",
+			"width": 150,
+		},
+		{
+			"fieldname": "visit_to_opportunity",
+			"label": _("Visit to Opportunity"),
+			"fieldtype": "Percent",
+			"width": 140,
+		},
+		{
+			"fieldname": "invoiced_customers",
+			"label": _("Invoiced Customers"),
+			"fieldtype": "Int",
+			"width": 140,
+		},
+		{
+			"fieldname": "invoiced_amount",
+			"label": _("Invoiced Amount"),
+			"fieldtype": "Currency",
+			"width": 150,
+		},
+		{
+			"fieldname": "converted_customers",
+			"label": _("Opportunity and Invoice"),
+			"fieldtype": "Int",
+			"width": 160,
+		},
+		{
+			"fieldname": "opportunity_to_invoice",
+			"label": _("Opportunity to Invoice"),
+			"fieldtype": "Percent",
+			"width": 150,
+		},
+		{
+			"fieldname": "visit_to_invoice",
+			"label": _("Visit to Invoice"),
+			"fieldtype": "Percent",
+			"width": 120,
+		},
+	]
+
+
+def get_data(filters):
+	"""Per sales person funnel. Each visited customer is followed from its first visit in the
+	period: opportunities for it within the opportunity window, invoices within the invoice window"""
+	conditions = get_conditions(filters)
+
+	query = f"""
+		WITH visit AS (
+			SELECT
+				svl.sales_person,
+				svl.customer,
+				MIN(svl.date_of_visit) as first_visit,
+				COUNT(svl.name) as visits
+			FROM `tabSales Visit Log` svl
+			WHERE svl.docstatus = 1
+			{conditions}
+			GROUP BY svl.sales_person, svl.customer
+		),
+		opportunity AS (
+			SELECT
+				visit.sales_person,
+				visit.customer,
+				COUNT(opp.name) as opportunities,
+				SUM(opp.base_opportunity_amount) as opportunity_amount
+			FROM visit
+			INNER JOIN `tabOpportunity` opp
+				ON opp.party_name = visit.customer
+				AND opp.opportunity_from = 'Customer'
+				AND opp.transaction_date BETWEEN visit.first_visit
+					AND DATE_ADD(visit.first_visit, INTERVAL %(opportunity_window)s DAY)
+			WHERE opp.docstatus != 2
+			GROUP BY visit.sales_person, visit.customer
+		),
+		invoice AS (
+			SELECT
+				visit.sales_person,
+				visit.customer,
+				SUM(si.base_net_total) as invoiced_amount
+			FROM visit
+			INNER JOIN `tabSales Invoice` si
+				ON si.customer = visit.customer
+				AND si.posting_date BETWEEN visit.first_visit
+					AND DATE_ADD(visit.first_visit, INTERVAL %(invoice_window)s DAY)
+			WHERE si.docstatus = 1
+			AND si.is_return = 0
+			GROUP BY visit.sales_person, visit.customer
+		)
+		SELECT
+			visit.sales_person,
+			SUM(visit.visits) as visits,
+			COUNT(visit.customer) as visited_customers,
+			COUNT(opportunity.customer) as opportunity_customers,
+			COALESCE(SUM(opportunity.opportunities), 0) as opportunities,
+			COALESCE(SUM(opportunity.opportunity_amount), 0) as opportunity_amount,
+			COUNT(invoice.customer) as invoiced_customers,
+			COALESCE(SUM(invoice.invoiced_amount), 0) as invoiced_amount,
+			COUNT(CASE WHEN opportunity.customer IS NOT NULL AND invoice.customer IS NOT NULL THEN 1 END)
+				as converted_customers
+		FROM visit
+		LEFT JOIN opportunity
+			ON opportunity.sales_person = visit.sales_person AND opportunity.customer = visit.customer
+		LEFT JOIN invoice
+			ON invoice.sales_person = visit.sales_person AND invoice.customer = visit.customer
+		GROUP BY visit.sales_person
+		ORDER BY invoiced_amount DESC
+	"""
+
+	data = frappe.db.sql(query, filters, as_dict=True)
+
+	for row in data:
+		row.visit_to_opportunity = get_rate(row.opportunity_customers, row.visited_customers)
+		row.opportunity_to_invoice = get_rate(row.converted_customers, row.opportunity_customers)
+		row.visit_to_invoice = get_rate(row.invoiced_customers, row.visited_customers)
+
+	return data
+
+
+def get_rate(converted, total):
+	return flt(converted) * 100 / total if total else 0
+
+
+def get_conditions(filters):
+	conditions = []
+
+	if filters.get("from_date"):
+		conditions.append("svl.date_of_visit >= %(from_date)s")
+
+	if filters.get("to_date"):
+		conditions.append("svl.date_of_visit <= %(to_date)s")
+
+	if filters.get("sales_person"):
+		conditions.append("svl.sales_person = %(sales_person)s")
+
+	if conditions:
+		return "AND " + " AND ".join(conditions)
+	else:
+		return ""
+
+
+def get_chart_data(data):
+	"""Customers at each funnel stage across all sales persons"""
+	return {
+		"data": {
+			"labels": [_("Visited"), _("Opportunity"), _("Invoiced")],
+			"datasets": [
+				{
+					"name": "Customers",
+					"values": [
+						sum(row.visited_customers for row in data),
+						sum(row.opportunity_customers for row in data),
+						sum(row.invoiced_customers for row in data),
+					],
+				}
+			],
+		},
+		"type": "bar",
+		"colors": ["#5e64ff"],
+	}
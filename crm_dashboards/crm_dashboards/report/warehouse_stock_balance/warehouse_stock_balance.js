@@ -0,0 +1,38 @@
+// Copyright (c) 2025, Meghwin Dave and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Warehouse Stock Balance"] = {
+	"chart": true,
+	"tree": true,
+	"name_field": "name",
+	"parent_field": "parent_warehouse",
+	"initial_depth": 2,
+	"filters": [
+		{
+			"fieldname": "company",
+			"label": __("Company"),
+			"fieldtype": "Link",
+			"options": "Company",
+			"default": frappe.defaults.get_user_default("Company"),
+			"reqd": 1
+		},
+		{
+			"fieldname": "warehouse_type",
+			"label": __("Warehouse Type"),
+			"fieldtype": "Link",
+			"options": "Warehouse Type"
+		},
+		{
+			"fieldname": "rollup",
+			"label": __("Include Child Warehouses in Groups"),
+			"fieldtype": "Check",
+			"default": 1
+		},
+		{
+			"fieldname": "show_disabled_warehouses",
+			"label": __("Show Disabled Warehouses"),
+			"fieldtype": "Check",
+			"default": 0
+		}
+	]
+};
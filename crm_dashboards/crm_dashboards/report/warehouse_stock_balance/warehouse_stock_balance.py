@@ -0,0 +1,131 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from crm_dashboards.crm_dashboards.profiler import profile_section
+from crm_dashboards.crm_dashboards.report_cache import report_cache
+
+# Bins change with every stock posting; the Stock Movement Summary job that follows each
+# posting invalidates this report, the TTL bounds how stale it can get otherwise
+BALANCE_TTL = 10 * 60
+
+
+@report_cache("Warehouse Stock Balance", BALANCE_TTL)
+def execute(filters=None):
+	if not filters:
+		filters = {}
+
+	columns = get_columns()
+	data = get_data(filters)
+	with profile_section("chart"):
+		chart = get_chart_data(data, filters)
+
+	return columns, data, None, chart
+
+
+def get_columns():
+	return [
+		{
+			"fieldname": "name",
+			"label": _("Warehouse"),
+			"fieldtype": "Link",
+			"options": "Warehouse",
+			"width": 220,
+		},
+		{"fieldname": "actual_qty", "label": _("Actual Qty"), "fieldtype": "Float", "width": 120},
+		{"fieldname": "stock_balance", "label": _("Stock Balance"), "fieldtype": "Currency", "width": 150},
+	]
+
+
+def get_data(filters):
+	"""Warehouse totals from Bin in one grouped query. With rollup, a group warehouse also
+	totals every warehouse below it in the tree"""
+	conditions = get_conditions(filters)
+
+	if cint(filters.get("rollup")):
+		join = """
+			LEFT JOIN `tabWarehouse` child ON child.lft >= wh.lft AND child.rgt <= wh.rgt
+			LEFT JOIN `tabBin` bin ON bin.warehouse = child.name
+		"""
+	else:
+		join = "LEFT JOIN `tabBin` bin ON bin.warehouse = wh.name"
+
+	query = f"""
+		SELECT
+			wh.name,
+			wh.parent_warehouse,
+			wh.is_group,
+			IFNULL(SUM(bin.actual_qty), 0) as actual_qty,
+			IFNULL(SUM(bin.stock_value), 0) as stock_balance
+		FROM `tabWarehouse` wh
+		{join}
+		WHERE 1 = 1
+		{conditions}
+		GROUP BY wh.name, wh.parent_warehouse, wh.is_group, wh.lft
+		ORDER BY wh.lft
+	"""
+
+	data = frappe.db.sql(query, filters, as_dict=True)
+
+	# Rows come in tree order, so a parent's indent is known before its children
+	indents = {}
+	for row in data:
+		row.indent = indents.get(row.parent_warehouse, -1) + 1
+		indents[row.name] = row.indent
+		row.stock_balance = flt(row.stock_balance)
+
+	return data
+
+
+def get_conditions(filters):
+	conditions = []
+
+	if filters.get("company"):
+		conditions.append("wh.company = %(company)s")
+
+	if not cint(filters.get("show_disabled_warehouses")):
+		conditions.append("wh.disabled = 0")
+
+	if filters.get("warehouse_type"):
+		conditions.append("wh.warehouse_type = %(warehouse_type)s")
+
+	if conditions:
+		return "AND " + " AND ".join(conditions)
+	else:
+		return ""
+
+
+def get_chart_data(data, filters):
+	"""Stock balance per warehouse: the top level of the tree when rolled up, the warehouses
+	holding stock otherwise"""
+	if cint(filters.get("rollup")):
+		rows = [row for row in data if row.indent == 1] or data
+	else:
+		rows = [row for row in data if not row.is_group]
+
+	return {
+		"data": {
+			"labels": [row.name for row in rows],
+			"datasets": [{"name": _("Stock Balance"), "values": [row.stock_balance for row in rows]}],
+		},
+		"type": "bar",
+		"fieldtype": "Currency",
+		"colors": ["#761ACB"],
+	}
+
+
+# Whitelisted method for dashboard chart
+@frappe.whitelist()
+@report_cache("Warehouse Stock Balance", BALANCE_TTL)
+def get_warehouse_stock_balance_chart(filters=None):
+	"""Whitelisted method for Warehouse Stock Balance chart"""
+	if not filters:
+		filters = {}
+
+	filters = frappe._dict(frappe.parse_json(filters))
+	data = get_data(filters)
+	with profile_section("chart"):
+		return get_chart_data(data, filters)
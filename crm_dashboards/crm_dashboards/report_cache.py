@@ -0,0 +1,349 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import copy
+import functools
+import hashlib
+import json
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import cint, cstr, now_datetime
+
+from crm_dashboards.crm_dashboards.date_windows import has_date_window, resolve_date_window
+from crm_dashboards.crm_dashboards.profiler import run_profiled
+
+CACHE_PREFIX = "crm_dashboards:report"
+VERSION_PREFIX = "crm_dashboards:report_version"
+STATS_PREFIX = "crm_dashboards:report_stats"
+DEFAULT_TTL = 60 * 60
+
+# Background refresh (stale-while-revalidate) registry
+REGISTRY_KEY = "crm_dashboards:report_registry"
+EXPIRY_KEY = "crm_dashboards:report_expiry"
+VIEWS_KEY = "crm_dashboards:report_views"
+LAST_VIEW_KEY = "crm_dashboards:report_last_view"
+
+# Stale entries stay servable for this many TTLs after going stale
+STALE_FACTOR = 1
+# The refresh job runs every 5 minutes, look a little further ahead than that
+REFRESH_LOOKAHEAD = 10 * 60
+MAX_REFRESHES_PER_RUN = 50
+IDLE_AFTER = 24 * 60 * 60
+
+# Results for relative date windows are recomputed every night for the new day's range and kept
+# until the next run, for recipes opened within the last week (covers weekends and holidays)
+WINDOW_TTL = 24 * 60 * 60
+WINDOW_IDLE_AFTER = 7 * 24 * 60 * 60
+
+# Cached results to drop when a document of the source doctype changes. Target Detail is a
+# child table without doc events of its own, targets are saved through their Sales Person.
+SOURCE_DOCTYPES = {
+	"Sales Invoice": (
+		"Sales Budget",
+		"Sales Budget Totals",
+		"Monthly Sales Report (Salesperson-wise)",
+		"Visit Conversion Funnel",
+	),
+	"Opportunity": (
+		"Deal Based Forecast",
+		"Opportunity Based Forecast",
+		"Deal Loss",
+		"Visit Conversion Funnel",
+	),
+	"Opportunity Pipeline Snapshot": ("Pipeline Waterfall",),
+	"Project": (
+		"Project Tracker",
+		"Project Order Value by Stage",
+		"Projects by Stage Funnel",
+		"Visit Timeline Chart",
+	),
+	"Customer": ("Customer Profile",),
+	"Customer RFM Score": ("Customer Profile",),
+	"Sales Visit Log": (
+		"Daily Sales Report (Weekly)",
+		"Sales Visit Heatmap",
+		"Visit Conversion Funnel",
+	),
+	"Sales Person": (
+		"Sales Budget",
+		"Sales Budget Totals",
+		"Monthly Sales Report (Salesperson-wise)",
+		"Customer Profile",
+	),
+	# Updated after every stock posting, which also moves the Bin totals
+	"Stock Movement Summary": ("Stock Movement Summary", "Warehouse Stock Balance"),
+	"Stock Ageing State": ("Stock Ageing Summary",),
+}
+
+
+def report_cache(name, ttl=DEFAULT_TTL):
+	"""Cache a report's execute or whitelisted chart method, which take filters only"""
+
+	def decorator(fn):
+		@functools.wraps(fn)
+		def wrapper(filters=None):
+			return get_cached_result(name, filters, fn, ttl, fn.__name__, f"{fn.__module__}.{fn.__name__}")
+
+		return wrapper
+
+	return decorator
+
+
+def get_filters_digest(filters):
+	"""Same digest for filters that differ only in key order, empty values or value types"""
+	if isinstance(filters, str):
+		filters = frappe.parse_json(filters)
+
+	normalized = {key: cstr(value) for key, value in (filters or {}).items() if value not in (None, "", [])}
+	return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+def get_cache_key(name, filters, method="execute"):
+	"""The report's version and the user's permission scope are part of the key"""
+	return f"{CACHE_PREFIX}:{frappe.scrub(name)}:{method}:v{get_version(name)}:{get_permission_scope()}:{get_filters_digest(filters)}"
+
+
+def get_cached_result(name, filters, compute, ttl=DEFAULT_TTL, method="execute", path=None):
+	"""Return the cached result for these filters, computing and storing it with compute(filters)
+	on a miss. A date_window filter is resolved to today's dates first. Past its TTL an entry is
+	still served, marked with when it was computed, for STALE_FACTOR more TTLs while a
+	background job recomputes it. Entries with a path are registered so
+	the scheduler can refresh them before they go stale"""
+	# The key has the resolved dates, the recipe keeps the window so it rolls over with the day
+	resolved = resolve_date_window(filters)
+	key = get_cache_key(name, resolved, method)
+	recipe = get_recipe_id(name, filters, method)
+	if path:
+		record_view(recipe)
+
+	entry = frappe.cache().get_value(key)
+	if not isinstance(entry, dict) or "fresh_until" not in entry:
+		count(name, "misses")
+		entry = store_result(key, run_profiled(name, method, compute, resolved), ttl)
+		if path:
+			register(recipe, name, method, path, filters, ttl, entry["fresh_until"])
+		return entry["result"]
+
+	count(name, "hits")
+	if entry["fresh_until"] > time.time():
+		return entry["result"]
+
+	count(name, "stale")
+	if path:
+		enqueue_refresh(recipe)
+
+	return mark_stale(entry)
+
+
+def store_result(key, result, ttl):
+	entry = {"result": result, "computed_at": cstr(now_datetime()), "fresh_until": time.time() + ttl}
+	frappe.cache().set_value(key, entry, expires_in_sec=int(ttl * (1 + STALE_FACTOR)))
+	return entry
+
+
+def mark_stale(entry):
+	"""The stale result, with its computation time shown to the user"""
+	result = copy.copy(entry["result"])
+	note = _("Showing results computed at {0} while they are refreshed").format(entry["computed_at"])
+
+	if isinstance(result, dict):
+		result["last_computed"] = entry["computed_at"]
+	elif isinstance(result, tuple) and len(result) > 2 and not result[2]:
+		result = result[:2] + (note,) + result[3:]
+
+	return result
+
+
+def get_recipe_id(name, filters, method):
+	"""Identifies what to recompute independently of the report's current version"""
+	return hashlib.sha1(
+		f"{name}|{method}|{get_permission_scope()}|{get_filters_digest(filters)}".encode()
+	).hexdigest()
+
+
+def register(recipe, name, method, path, filters, ttl, fresh_until):
+	cache = frappe.cache()
+	cache.hset(
+		REGISTRY_KEY,
+		recipe,
+		{
+			"name": name,
+			"method": method,
+			"path": path,
+			"filters": frappe.parse_json(filters) if isinstance(filters, str) else filters,
+			"user": frappe.session.user,
+			"ttl": ttl,
+		},
+	)
+	cache.zadd(cache.make_key(EXPIRY_KEY), {recipe: fresh_until})
+
+
+def record_view(recipe):
+	cache = frappe.cache()
+	cache.zincrby(cache.make_key(VIEWS_KEY), 1, recipe)
+	cache.hset(LAST_VIEW_KEY, recipe, time.time())
+
+
+def enqueue_refresh(recipe, keep_for=None):
+	frappe.enqueue(
+		"crm_dashboards.crm_dashboards.report_cache.refresh_result",
+		queue="short",
+		job_id=f"crm_report_refresh:{recipe}",
+		deduplicate=True,
+		recipe=recipe,
+		keep_for=keep_for,
+	)
+
+
+def refresh_result(recipe, keep_for=None):
+	"""Recompute one registered result as the user it was first computed for, keeping it fresh
+	for keep_for seconds instead of the report's own TTL when given"""
+	entry = frappe.cache().hget(REGISTRY_KEY, recipe)
+	if not entry:
+		return
+
+	user = frappe.session.user
+	frappe.set_user(entry["user"])
+	frappe.local.flags.crm_report_permission_scope = None
+	try:
+		fn = frappe.get_attr(entry["path"])
+		fn = getattr(fn, "__wrapped__", fn)
+		filters = frappe._dict(entry["filters"] or {}) if entry["method"] == "execute" else entry["filters"]
+		filters = resolve_date_window(filters)
+
+		stored = store_result(
+			get_cache_key(entry["name"], filters, entry["method"]),
+			run_profiled(entry["name"], entry["method"], fn, filters),
+			keep_for or entry["ttl"],
+		)
+		cache = frappe.cache()
+		cache.zadd(cache.make_key(EXPIRY_KEY), {recipe: stored["fresh_until"]})
+		count(entry["name"], "refreshes")
+	finally:
+		frappe.set_user(user)
+		frappe.local.flags.crm_report_permission_scope = None
+
+
+def refresh_expiring():
+	"""Scheduler job: enqueue refreshes for results going stale within the next run,
+	most viewed first, and forget results nobody has opened for IDLE_AFTER seconds"""
+	cache = frappe.cache()
+	horizon = time.time() + REFRESH_LOOKAHEAD
+	expiring = [cstr(recipe) for recipe in cache.zrangebyscore(cache.make_key(EXPIRY_KEY), 0, horizon)]
+	if not expiring:
+		return
+
+	views_key = cache.make_key(VIEWS_KEY)
+	ranked = sorted(expiring, key=lambda recipe: cache.zscore(views_key, recipe) or 0, reverse=True)
+
+	refreshed = 0
+	for recipe in ranked:
+		last_view = cache.hget(LAST_VIEW_KEY, recipe) or 0
+		if last_view < time.time() - IDLE_AFTER:
+			# Date window results idle for a day are left to the nightly precompute
+			if last_view < time.time() - WINDOW_IDLE_AFTER or not is_date_window_recipe(recipe):
+				forget(recipe)
+			continue
+
+		if refreshed < MAX_REFRESHES_PER_RUN:
+			enqueue_refresh(recipe)
+			refreshed += 1
+
+
+def precompute_date_windows():
+	"""Scheduler job: recompute every registered date window result for the new day's range,
+	so the first dashboard view of the day is a cache hit"""
+	cache = frappe.cache()
+	idle_since = time.time() - WINDOW_IDLE_AFTER
+
+	for recipe, entry in (cache.hgetall(REGISTRY_KEY) or {}).items():
+		recipe = cstr(recipe)
+		if not has_date_window(entry.get("filters")):
+			continue
+
+		if (cache.hget(LAST_VIEW_KEY, recipe) or 0) < idle_since:
+			forget(recipe)
+		else:
+			enqueue_refresh(recipe, WINDOW_TTL)
+
+
+def is_date_window_recipe(recipe):
+	entry = frappe.cache().hget(REGISTRY_KEY, recipe)
+	return bool(entry and has_date_window(entry.get("filters")))
+
+
+def forget(recipe):
+	cache = frappe.cache()
+	cache.hdel(REGISTRY_KEY, recipe)
+	cache.hdel(LAST_VIEW_KEY, recipe)
+	cache.zrem(cache.make_key(EXPIRY_KEY), recipe)
+	cache.zrem(cache.make_key(VIEWS_KEY), recipe)
+
+
+def get_permission_scope():
+	"""Users with the same roles and user permissions see the same report output"""
+	if not frappe.local.flags.crm_report_permission_scope:
+		user = frappe.session.user
+		scope = {
+			"roles": sorted(frappe.get_roles(user)),
+			"user_permissions": frappe.defaults.get_user_permissions(user),
+		}
+		frappe.local.flags.crm_report_permission_scope = hashlib.sha1(
+			json.dumps(scope, sort_keys=True, default=str).encode()
+		).hexdigest()[:16]
+
+	return frappe.local.flags.crm_report_permission_scope
+
+
+def get_version(name):
+	cache = frappe.cache()
+	return cint(cache.get(cache.make_key(f"{VERSION_PREFIX}:{frappe.scrub(name)}")))
+
+
+def invalidate_report(name):
+	"""Bump the report's version so every cached result for it becomes unreachable, TTL removes them"""
+	cache = frappe.cache()
+	cache.incr(cache.make_key(f"{VERSION_PREFIX}:{frappe.scrub(name)}"))
+
+
+def invalidate_doctype(doctype):
+	for name in SOURCE_DOCTYPES.get(doctype, ()):
+		invalidate_report(name)
+
+
+def invalidate_for_doc(doc, method=None):
+	"""doc_events handler for the source doctypes"""
+	invalidate_doctype(doc.doctype)
+
+
+def count(name, outcome):
+	cache = frappe.cache()
+	cache.incr(cache.make_key(f"{STATS_PREFIX}:{frappe.scrub(name)}:{outcome}"))
+
+
+@frappe.whitelist()
+def get_cache_stats():
+	"""Hit and miss counters per cached report"""
+	frappe.only_for("System Manager")
+
+	cache = frappe.cache()
+	names = sorted({name for names in SOURCE_DOCTYPES.values() for name in names})
+	stats = {}
+
+	for name in names:
+		hits, misses, stale, refreshes = (
+			cint(cache.get(cache.make_key(f"{STATS_PREFIX}:{frappe.scrub(name)}:{outcome}")))
+			for outcome in ("hits", "misses", "stale", "refreshes")
+		)
+		stats[name] = {
+			"hits": hits,
+			"misses": misses,
+			"stale": stale,
+			"refreshes": refreshes,
+			"hit_rate": round(hits * 100 / (hits + misses), 1) if hits + misses else None,
+			"version": get_version(name),
+		}
+
+	return stats
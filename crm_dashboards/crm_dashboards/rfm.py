@@ -0,0 +1,153 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import frappe
+import numpy as np
+from frappe.utils import getdate, now, today
+
+from crm_dashboards.crm_dashboards.report_cache import invalidate_doctype
+
+RFM_BINS = 5
+
+# Evaluated in order, first match wins; anything left over is "Lost"
+SEGMENT_RULES = [
+	("Champions", lambda r, f: (r >= 4) & (f >= 4)),
+	("Loyal Customers", lambda r, f: (r >= 3) & (f >= 4)),
+	("Potential Loyalists", lambda r, f: (r >= 4) & (f >= 2)),
+	("New Customers", lambda r, f: r >= 4),
+	("Need Attention", lambda r, f: r == 3),
+	("Cannot Lose Them", lambda r, f: (r == 1) & (f >= 4)),
+	("At Risk", lambda r, f: f >= 3),
+	("Hibernating", lambda r, f: r == 2),
+]
+
+
+def update_rfm_scores(as_of=None):
+	"""Recompute Customer RFM Score for every customer with a submitted Sales Invoice"""
+	as_of = getdate(as_of or today())
+
+	rows = frappe.db.sql(
+		"""
+		SELECT
+			si.customer,
+			MAX(si.posting_date) as last_invoice_date,
+			COUNT(si.name) as frequency,
+			SUM(si.base_net_total) as monetary
+		FROM `tabSales Invoice` si
+		WHERE si.docstatus = 1
+		AND si.is_return = 0
+		AND si.posting_date <= %(as_of)s
+		GROUP BY si.customer
+	""",
+		{"as_of": as_of},
+	)
+
+	frappe.db.delete("Customer RFM Score")
+
+	if not rows:
+		return 0
+
+	customers, last_dates, frequency, monetary = zip(*rows, strict=True)
+	scores = score_customers(
+		np.array(last_dates, dtype="datetime64[D]"),
+		np.array(frequency, dtype=float),
+		np.array(monetary, dtype=float),
+		as_of,
+	)
+
+	save_scores(customers, last_dates, scores, as_of)
+	invalidate_doctype("Customer RFM Score")
+	return len(customers)
+
+
+def score_customers(last_dates, frequency, monetary, as_of):
+	"""Vectorized recency/frequency/monetary scoring over whole customer arrays"""
+	recency_days = (np.datetime64(getdate(as_of), "D") - last_dates).astype(int)
+	frequency = np.nan_to_num(frequency)
+	monetary = np.nan_to_num(monetary)
+
+	# Lower recency is better, so its score runs the other way
+	recency_score = (RFM_BINS + 1 - quantile_scores(recency_days)).astype(np.int8)
+	frequency_score = quantile_scores(frequency)
+	monetary_score = quantile_scores(monetary)
+
+	return {
+		"recency_days": recency_days,
+		"frequency": frequency,
+		"monetary": monetary,
+		"recency_score": recency_score,
+		"frequency_score": frequency_score,
+		"monetary_score": monetary_score,
+		# The scores are int8, widen them before combining or 555 overflows
+		"rfm_score": (
+			recency_score.astype(np.int16) * 100
+			+ frequency_score.astype(np.int16) * 10
+			+ monetary_score.astype(np.int16)
+		).astype(str),
+		"segment": get_segments(recency_score, frequency_score),
+	}
+
+
+def quantile_scores(values, bins=RFM_BINS):
+	"""Score each value 1..bins by percentile rank, giving tied values their average rank"""
+	values = np.asarray(values, dtype=float)
+	if not len(values):
+		return np.zeros(0, dtype=np.int8)
+
+	_uniques, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+	average_ranks = np.cumsum(counts) - (counts - 1) / 2.0
+	percentiles = average_ranks[inverse] / len(values)
+
+	return np.clip(np.ceil(percentiles * bins), 1, bins).astype(np.int8)
+
+
+def get_segments(recency_score, frequency_score):
+	conditions = [rule(recency_score, frequency_score) for _segment, rule in SEGMENT_RULES]
+	choices = [segment for segment, _rule in SEGMENT_RULES]
+	return np.select(conditions, choices, default="Lost")
+
+
+def save_scores(customers, last_dates, scores, as_of):
+	timestamp = now()
+	user = frappe.session.user
+
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"modified_by",
+		"owner",
+		"docstatus",
+		"customer",
+		"segment",
+		"rfm_score",
+		"computed_on",
+		"last_invoice_date",
+		"recency_days",
+		"frequency",
+		"monetary",
+		"recency_score",
+		"frequency_score",
+		"monetary_score",
+	]
+
+	columns = zip(
+		customers,
+		scores["segment"].tolist(),
+		scores["rfm_score"].tolist(),
+		last_dates,
+		scores["recency_days"].tolist(),
+		scores["frequency"].astype(int).tolist(),
+		scores["monetary"].tolist(),
+		scores["recency_score"].tolist(),
+		scores["frequency_score"].tolist(),
+		scores["monetary_score"].tolist(),
+		strict=True,
+	)
+
+	values = [
+		(customer, timestamp, timestamp, user, user, 0, customer, segment, rfm_score, as_of, *rest)
+		for customer, segment, rfm_score, *rest in columns
+	]
+
+	frappe.db.bulk_insert("Customer RFM Score", fields, values)
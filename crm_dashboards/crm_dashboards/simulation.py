@@ -0,0 +1,266 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import cint, flt, getdate
+
+from crm_dashboards.crm_dashboards.pipeline import (
+	BASE_AMOUNT,
+	get_period_expression,
+	get_period_label,
+	prepare_horizon_query,
+)
+from crm_dashboards.crm_dashboards.profiler import profile_section
+
+DEFAULT_TRIALS = 5000
+MAX_TRIALS = 100000
+DEFAULT_TIME_BUDGET = 10
+MAX_TIME_BUDGET = 60
+QUANTILES = (10, 50, 90)
+
+# Trials x opportunities drawn at once, bounds memory to a few tens of MB per chunk
+CHUNK_CELLS = 2_000_000
+# Runs bigger than this fan out to a process pool
+PARALLEL_CELLS = 50_000_000
+
+
+def execute_simulation(filters, conditions=""):
+	"""Report result for the Simulation view of the forecast reports"""
+	trials, time_budget, seed = get_run_settings(filters)
+	pipeline, horizon = load_pipeline(filters, conditions)
+	period_dimension = get_period_dimension(filters)
+
+	if not pipeline:
+		return get_columns(), [], _("No open opportunities close within the horizon."), None
+
+	# ISO period starts sort chronologically; they are turned into labels for display
+	periods = [str(getdate(row.period_start)) for row in pipeline]
+	owners = [row.owner or _("Not Assigned") for row in pipeline]
+	amounts = np.array([flt(row.amount) for row in pipeline])
+	probabilities = np.clip(np.array([flt(row.probability) for row in pipeline]) / 100, 0, 1)
+
+	groupings = [get_grouping(periods), get_grouping(owners)]
+	start = time.time()
+	totals, grouped = simulate(
+		amounts,
+		probabilities,
+		[(order, starts) for _labels, _inverse, order, starts in groupings],
+		trials,
+		seed,
+		time_budget,
+	)
+	elapsed = time.time() - start
+
+	weighted = amounts * probabilities
+	data = [get_band_row(_("Total"), _("All Opportunities"), len(amounts), weighted.sum(), totals, horizon)]
+
+	for dimension, (labels, inverse, _order, _starts), outcomes in zip(
+		(period_dimension, _("Sales Person")), groupings, grouped, strict=True
+	):
+		counts = np.bincount(inverse, minlength=len(labels))
+		weighted_sums = np.bincount(inverse, weights=weighted, minlength=len(labels))
+		for i, label in enumerate(labels):
+			if dimension == period_dimension:
+				label = get_period_label(getdate(label), filters)
+			data.append(get_band_row(dimension, label, counts[i], weighted_sums[i], outcomes[:, i], horizon))
+
+	message = _("{0} of {1} trials in {2}s with seed {3}").format(
+		len(totals), trials, round(elapsed, 2), seed
+	)
+	if len(totals) < trials:
+		message += " " + _("(stopped at the {0}s time budget)").format(time_budget)
+
+	with profile_section("chart"):
+		chart = get_chart(data, period_dimension)
+
+	return get_columns(), data, message, chart
+
+
+def get_run_settings(filters):
+	"""Trials, time budget and seed from the filters; unset values take the defaults"""
+	trials = cint(filters.get("trials")) or DEFAULT_TRIALS
+	time_budget = flt(filters.get("time_budget")) or DEFAULT_TIME_BUDGET
+	seed = cint(filters.get("seed"))
+
+	if trials < 1:
+		frappe.throw(_("Trials must be at least 1"))
+
+	if time_budget <= 0:
+		frappe.throw(_("Time budget must be more than 0 seconds"))
+
+	if seed < 0:
+		frappe.throw(_("Seed must be 0 or more"))
+
+	return min(trials, MAX_TRIALS), min(time_budget, MAX_TIME_BUDGET), seed or secrets.randbits(32)
+
+
+def get_period_dimension(filters):
+	if filters.get("periodicity") == "Weekly":
+		return _("Week")
+
+	return _("Month")
+
+
+def load_pipeline(filters, conditions=""):
+	"""Open pipeline in the horizon, one row per opportunity with its company-currency amount"""
+	horizon = prepare_horizon_query(filters, conditions)
+
+	pipeline = frappe.db.sql(
+		f"""
+		SELECT
+			{get_period_expression(filters)} as period_start,
+			opp.opportunity_owner as owner,
+			{BASE_AMOUNT} as amount,
+			opp.probability
+		FROM `tabOpportunity` opp
+		LEFT JOIN `{horizon.rate_table}` rate
+			ON rate.currency = opp.currency AND rate.rate_date = opp.transaction_date
+		{horizon.where}
+	""",
+		horizon.values,
+		as_dict=True,
+	)
+
+	return pipeline, horizon
+
+
+def get_grouping(keys):
+	"""Sorted labels, each key's label index, and the column order and segment starts that make
+	each label's columns contiguous for np.add.reduceat"""
+	labels, inverse = np.unique(np.array(keys, dtype=object), return_inverse=True)
+	order = np.argsort(inverse, kind="stable")
+	starts = np.searchsorted(inverse[order], np.arange(len(labels)))
+	return labels.tolist(), inverse, order, starts
+
+
+def simulate(amounts, probabilities, groupings, trials, seed, time_budget):
+	"""Draw won/lost outcomes for every opportunity, splitting work across processes for large runs"""
+	deadline = time.time() + time_budget
+	workers = get_worker_count(trials * len(amounts))
+	seeds = np.random.SeedSequence(seed).spawn(workers)
+	shares = [trials // workers + (1 if i < trials % workers else 0) for i in range(workers)]
+
+	if workers == 1:
+		results = [run_trials(amounts, probabilities, groupings, shares[0], seeds[0], deadline)]
+	else:
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			futures = [
+				executor.submit(run_trials, amounts, probabilities, groupings, share, child_seed, deadline)
+				for share, child_seed in zip(shares, seeds, strict=True)
+			]
+			results = [future.result() for future in futures]
+
+	totals = np.concatenate([result[0] for result in results])
+	grouped = [np.vstack([result[1][i] for result in results]) for i in range(len(groupings))]
+	return totals, grouped
+
+
+def get_worker_count(cells):
+	if cells < PARALLEL_CELLS:
+		return 1
+
+	configured = cint(frappe.conf.get("crm_dashboards_simulation_workers"))
+	return max(1, configured or min(os.cpu_count() or 1, 4))
+
+
+def run_trials(amounts, probabilities, groupings, trials, seed, deadline):
+	"""Simulate in memory-bounded chunks until all trials are done or the deadline passes"""
+	rng = np.random.default_rng(seed)
+	chunk_size = max(1, CHUNK_CELLS // max(len(amounts), 1))
+
+	totals = []
+	grouped = [[] for _grouping in groupings]
+	done = 0
+
+	while done < trials and time.time() < deadline:
+		size = min(chunk_size, trials - done)
+		revenue = (rng.random((size, len(amounts))) < probabilities) * amounts
+
+		totals.append(revenue.sum(axis=1))
+		for i, (order, starts) in enumerate(groupings):
+			grouped[i].append(np.add.reduceat(revenue[:, order], starts, axis=1))
+
+		done += size
+
+	return (
+		np.concatenate(totals) if totals else np.zeros(0),
+		[
+			np.vstack(chunks) if chunks else np.zeros((0, len(starts)))
+			for chunks, (_order, starts) in zip(grouped, groupings, strict=True)
+		],
+	)
+
+
+def get_band_row(dimension, label, opportunities, weighted_amount, outcomes, horizon):
+	p10, p50, p90 = np.percentile(outcomes, QUANTILES) if len(outcomes) else (0, 0, 0)
+	return frappe._dict(
+		dimension=dimension,
+		label=label,
+		opportunities=int(opportunities),
+		weighted_amount=flt(weighted_amount),
+		p10=flt(p10),
+		p50=flt(p50),
+		p90=flt(p90),
+		company_currency=horizon.company_currency,
+	)
+
+
+def get_columns():
+	return [
+		{"fieldname": "dimension", "label": _("Dimension"), "fieldtype": "Data", "width": 120},
+		{"fieldname": "label", "label": _("Value"), "fieldtype": "Data", "width": 180},
+		{"fieldname": "opportunities", "label": _("Opportunities"), "fieldtype": "Int", "width": 110},
+		{
+			"fieldname": "weighted_amount",
+			"label": _("Weighted Amount"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 150,
+		},
+		{
+			"fieldname": "p10",
+			"label": _("P10"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 150,
+		},
+		{
+			"fieldname": "p50",
+			"label": _("P50"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 150,
+		},
+		{
+			"fieldname": "p90",
+			"label": _("P90"),
+			"fieldtype": "Currency",
+			"options": "company_currency",
+			"width": 150,
+		},
+	]
+
+
+def get_chart(data, period_dimension):
+	"""P10/P50/P90 revenue bands per expected close month or week"""
+	period_rows = [row for row in data if row.dimension == period_dimension]
+
+	return {
+		"data": {
+			"labels": [row.label for row in period_rows],
+			"datasets": [
+				{"name": _("P10"), "values": [row.p10 for row in period_rows]},
+				{"name": _("P50"), "values": [row.p50 for row in period_rows]},
+				{"name": _("P90"), "values": [row.p90 for row in period_rows]},
+			],
+		},
+		"type": "line",
+		"fieldtype": "Currency",
+	}
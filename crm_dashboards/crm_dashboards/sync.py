@@ -0,0 +1,173 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import base64
+import gzip
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint, cstr
+
+from crm_dashboards.crm_dashboards.visits import VISIT_FIELDS, bulk_insert_visits, parse_visits
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Before any real timestamp, so a client without a watermark gets everything
+EPOCH = "1900-01-01 00:00:00"
+
+SYNC_ENTITIES = {
+	"visits": ("Sales Visit Log", ("name", "modified", "docstatus", *VISIT_FIELDS)),
+	"customers": (
+		"Customer",
+		(
+			"name",
+			"modified",
+			"customer_name",
+			"customer_group",
+			"territory",
+			"market_segment",
+			"customer_type",
+			"disabled",
+		),
+	),
+	"sales_people": (
+		"Sales Person",
+		("name", "modified", "sales_person_name", "parent_sales_person", "is_group", "enabled"),
+	),
+}
+
+
+@frappe.whitelist()
+def pull_changes(cursor=None, since=None, page_size=None):
+	"""Visits, customers, sales people and deletions changed after the cursor, one page each.
+	The payload is columnar JSON, gzipped and base64 encoded; keep calling with the returned
+	cursor while has_more is set, then store it as the watermark for the next sync"""
+	for doctype, _fields in SYNC_ENTITIES.values():
+		frappe.has_permission(doctype, "read", throw=True)
+
+	page_size = min(cint(page_size) or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+	positions = decode_cursor(cursor, since)
+
+	payload, has_more = {}, False
+	for entity, (doctype, fields) in SYNC_ENTITIES.items():
+		rows = get_changed_rows(doctype, fields, positions[entity], page_size)
+		has_more = has_more or len(rows) > page_size
+		rows = rows[:page_size]
+
+		if rows:
+			positions[entity] = [cstr(rows[-1][1]), rows[-1][0]]
+		payload[entity] = to_columns(fields, rows)
+
+	deleted = get_deleted_rows(positions["deleted"], page_size)
+	has_more = has_more or len(deleted) > page_size
+	deleted = deleted[:page_size]
+	if deleted:
+		positions["deleted"] = [cstr(deleted[-1][1]), deleted[-1][0]]
+	# The cursor moves past every row read, the payload only lists what the user could see
+	payload["deleted"] = to_columns(
+		("name", "creation", "doctype", "docname"),
+		[row[:4] for row in deleted if can_read_deleted(row[2], row[4])],
+	)
+
+	return {
+		"cursor": encode_cursor(positions),
+		"has_more": has_more,
+		"data": compress(payload),
+	}
+
+
+@frappe.whitelist(methods=["POST"])
+def push_visits(visits):
+	"""Save visits logged offline. Each needs a client-generated client_id, so a retried push
+	returns the names saved the first time instead of creating duplicates"""
+	rows = parse_visits(visits)
+
+	missing = [idx for idx, row in enumerate(rows) if not (isinstance(row, dict) and row.get("client_id"))]
+	if missing:
+		frappe.throw(_("client_id is required, missing in rows {0}").format(", ".join(map(str, missing))))
+
+	return bulk_insert_visits(rows)
+
+
+def get_changed_rows(doctype, fields, position, page_size):
+	"""Keyset page on (modified, name), so rows sharing a timestamp are never skipped or repeated.
+	Goes through get_list so user permissions and match conditions apply"""
+	modified, name = position
+
+	return frappe.get_list(
+		doctype,
+		fields=list(fields),
+		filters=[["modified", ">=", modified]],
+		or_filters=[["modified", ">", modified], ["name", ">", name]],
+		order_by="modified asc, name asc",
+		limit_page_length=page_size + 1,
+		as_list=True,
+	)
+
+
+def get_deleted_rows(position, page_size):
+	"""Keyset page of deletions with each document's last saved data, which can_read_deleted
+	checks before the deletion is passed on"""
+	creation, name = position
+
+	return frappe.db.sql(
+		"""
+		SELECT name, creation, deleted_doctype, deleted_name, data
+		FROM `tabDeleted Document`
+		WHERE deleted_doctype IN %(doctypes)s
+		AND (creation > %(creation)s OR (creation = %(creation)s AND name > %(name)s))
+		ORDER BY creation, name
+		LIMIT %(limit)s
+	""",
+		{
+			"doctypes": [doctype for doctype, _fields in SYNC_ENTITIES.values()],
+			"creation": creation,
+			"name": name,
+			"limit": page_size + 1,
+		},
+	)
+
+
+def can_read_deleted(doctype, data):
+	"""Whether the user could have read the document as it was when it was deleted"""
+	try:
+		doc = frappe.get_doc(json.loads(data))
+	except (TypeError, ValueError):
+		return False
+
+	return frappe.has_permission(doctype, "read", doc=doc)
+
+
+def to_columns(fields, rows):
+	return {
+		"fields": list(fields),
+		"columns": [list(column) for column in zip(*rows, strict=True)]
+		if rows
+		else [[] for _field in fields],
+	}
+
+
+def compress(payload):
+	data = json.dumps(payload, default=cstr, separators=(",", ":")).encode()
+	return base64.b64encode(gzip.compress(data)).decode()
+
+
+def encode_cursor(positions):
+	return base64.urlsafe_b64encode(json.dumps(positions, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor=None, since=None):
+	"""Per-entity (timestamp, name) positions, starting from the since watermark for a new sync"""
+	start = [cstr(since) or EPOCH, ""]
+	positions = {entity: list(start) for entity in SYNC_ENTITIES}
+	positions["deleted"] = list(start)
+
+	if cursor:
+		try:
+			positions.update(json.loads(base64.urlsafe_b64decode(cstr(cursor).encode())))
+		except ValueError:
+			frappe.throw(_("Invalid sync cursor"))
+
+	return positions
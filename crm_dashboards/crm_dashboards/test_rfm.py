@@ -0,0 +1,34 @@
+# Copyright (c) 2025, Meghwin Dave and Contributors
+# See license.txt
+
+import unittest
+
+import numpy as np
+
+from crm_dashboards.crm_dashboards.rfm import quantile_scores, score_customers
+
+
+class TestRFM(unittest.TestCase):
+	def test_quantile_scores(self):
+		scores = quantile_scores(np.arange(1, 11))
+		self.assertEqual(scores.tolist(), [1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+
+	def test_quantile_scores_ties(self):
+		# Tied values share their average rank and so their score
+		scores = quantile_scores([7, 7, 7, 7, 1])
+		self.assertEqual(scores.tolist(), [4, 4, 4, 4, 1])
+
+	def test_quantile_scores_empty(self):
+		self.assertEqual(len(quantile_scores([])), 0)
+
+	def test_rfm_score(self):
+		last_dates = np.array(
+			["2025-06-30", "2025-01-01", "2025-06-01", "2025-03-01", "2024-06-01"], dtype="datetime64[D]"
+		)
+		frequency = np.array([50, 2, 20, 5, 1], dtype=float)
+		monetary = np.array([9000, 200, 5000, 300, 100], dtype=float)
+
+		scores = score_customers(last_dates, frequency, monetary, "2025-07-01")
+
+		self.assertEqual(scores["rfm_score"].tolist(), ["555", "222", "444", "333", "111"])
+		self.assertEqual(scores["segment"][0], "Champions")
@@ -0,0 +1,53 @@
+# Copyright (c) 2025, Meghwin Dave and Contributors
+# See license.txt
+
+import time
+import unittest
+
+import numpy as np
+
+from crm_dashboards.crm_dashboards.simulation import get_grouping, run_trials, simulate
+
+AMOUNTS = np.array([100.0, 200.0, 300.0, 400.0])
+PROBABILITIES = np.array([0.1, 0.5, 0.9, 0.3])
+OWNERS = ["b", "a", "b", "c"]
+
+
+def get_groupings():
+	_labels, _inverse, order, starts = get_grouping(OWNERS)
+	return [(order, starts)]
+
+
+class TestSimulation(unittest.TestCase):
+	def test_same_seed_same_outcomes(self):
+		first, first_grouped = simulate(AMOUNTS, PROBABILITIES, get_groupings(), 500, 42, 10)
+		second, second_grouped = simulate(AMOUNTS, PROBABILITIES, get_groupings(), 500, 42, 10)
+
+		self.assertEqual(len(first), 500)
+		np.testing.assert_array_equal(first, second)
+		np.testing.assert_array_equal(first_grouped[0], second_grouped[0])
+
+	def test_groups_add_up_to_totals(self):
+		totals, grouped = simulate(AMOUNTS, PROBABILITIES, get_groupings(), 200, 7, 10)
+
+		# Owners sort to a, b, c
+		self.assertEqual(grouped[0].shape, (200, 3))
+		np.testing.assert_allclose(grouped[0].sum(axis=1), totals)
+
+	def test_certain_outcomes(self):
+		probabilities = np.array([1.0, 0.0, 1.0, 0.0])
+		totals, grouped = simulate(AMOUNTS, probabilities, get_groupings(), 50, 1, 10)
+
+		np.testing.assert_array_equal(totals, np.full(50, 400.0))
+		np.testing.assert_array_equal(grouped[0][0], [0.0, 400.0, 0.0])
+
+	def test_mean_close_to_weighted_amount(self):
+		totals, _grouped = simulate(AMOUNTS, PROBABILITIES, get_groupings(), 20000, 3, 10)
+		self.assertAlmostEqual(totals.mean(), (AMOUNTS * PROBABILITIES).sum(), delta=5)
+
+	def test_run_trials_stops_at_deadline(self):
+		seed = np.random.SeedSequence(5)
+		totals, grouped = run_trials(AMOUNTS, PROBABILITIES, get_groupings(), 100, seed, time.time() - 1)
+
+		self.assertEqual(len(totals), 0)
+		self.assertEqual(grouped[0].shape, (0, 3))
@@ -0,0 +1,213 @@
+# Copyright (c) 2025, Meghwin Dave and contributors
+# For license information, please see license.txt
+
+import csv
+import io
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cstr, flt, getdate, now
+
+from crm_dashboards.crm_dashboards.report_cache import invalidate_doctype
+
+# Rows per multi-row INSERT and per transaction
+CHUNK_SIZE = 500
+
+# Sales Visit Log names are format:SVL-{#####}
+NAME_PREFIX = "SVL-"
+NAME_DIGITS = 5
+
+VISIT_FIELDS = (
+	"date_of_visit",
+	"sales_person",
+	"customer",
+	"location",
+	"customer_segment",
+	"customer_type",
+	"objective_of_meeting",
+	"outcome_of_meeting",
+	"estimated_order_value",
+	"order_lost_value",
+	"reason_for_lost",
+	"next_action_plan",
+	"support_required",
+	"client_id",
+)
+
+REQUIRED_FIELDS = (
+	"date_of_visit",
+	"sales_person",
+	"customer",
+	"location",
+	"objective_of_meeting",
+	"outcome_of_meeting",
+)
+CURRENCY_FIELDS = ("estimated_order_value", "order_lost_value")
+LINK_FIELDS = {
+	"sales_person": "Sales Person",
+	"customer": "Customer",
+	"customer_segment": "Market Segment",
+}
+
+
+@frappe.whitelist(methods=["POST"])
+def bulk_insert_visits(visits, data_format="json"):
+	"""Insert and submit a batch of Sales Visit Logs given as a JSON list or CSV text.
+	Invalid rows are reported by index and skipped, rows whose client_id was already saved
+	come back with their existing name, the rest are saved chunk by chunk"""
+	frappe.has_permission("Sales Visit Log", "create", throw=True)
+	frappe.has_permission("Sales Visit Log", "submit", throw=True)
+
+	rows = parse_visits(visits, data_format)
+	valid, errors = validate_visits(rows)
+	valid, existing = split_existing(valid)
+
+	names = []
+	for start in range(0, len(valid), CHUNK_SIZE):
+		chunk = valid[start : start + CHUNK_SIZE]
+		try:
+			names.extend(insert_chunk([visit for _idx, visit in chunk]))
+			frappe.db.commit()
+		except Exception as e:
+			frappe.db.rollback()
+			errors.extend({"row": idx, "error": cstr(e)} for idx, _visit in chunk)
+
+	# Rows were written without doc events, so drop the dependent report caches here
+	if names:
+		invalidate_doctype("Sales Visit Log")
+
+	return {
+		"inserted": len(names),
+		"names": names,
+		"existing": existing,
+		"errors": sorted(errors, key=lambda error: error["row"]),
+	}
+
+
+def parse_visits(visits, data_format="json"):
+	if isinstance(visits, list | tuple):
+		return list(visits)
+
+	if data_format == "csv":
+		return list(csv.DictReader(io.StringIO(cstr(visits))))
+
+	rows = json.loads(visits)
+	if not isinstance(rows, list):
+		frappe.throw(_("Visits must be a list of records"))
+
+	return rows
+
+
+def validate_visits(rows):
+	"""Check every row, resolving all link values with one query per linked doctype"""
+	existing = {}
+	for fieldname, doctype in LINK_FIELDS.items():
+		values = {cstr(row.get(fieldname)).strip() for row in rows if isinstance(row, dict)} - {""}
+		existing[fieldname] = (
+			set(frappe.get_all(doctype, filters={"name": ["in", list(values)]}, pluck="name"))
+			if values
+			else set()
+		)
+
+	meta = frappe.get_meta("Sales Visit Log")
+	options = {
+		fieldname: set(cstr(meta.get_options(fieldname)).split("\n")) - {""}
+		for fieldname in ("customer_type", "outcome_of_meeting")
+	}
+
+	valid, errors = [], []
+	client_ids = set()
+	for idx, row in enumerate(rows):
+		if not isinstance(row, dict):
+			errors.append({"row": idx, "error": _("Row is not a record")})
+			continue
+
+		visit = {fieldname: cstr(row.get(fieldname)).strip() or None for fieldname in VISIT_FIELDS}
+		messages = [
+			_("{0} is required").format(fieldname) for fieldname in REQUIRED_FIELDS if not visit[fieldname]
+		]
+
+		for fieldname, doctype in LINK_FIELDS.items():
+			if visit[fieldname] and visit[fieldname] not in existing[fieldname]:
+				messages.append(_("{0} {1} does not exist").format(_(doctype), visit[fieldname]))
+
+		for fieldname, allowed in options.items():
+			if visit[fieldname] and visit[fieldname] not in allowed:
+				messages.append(_("{0} is not a valid value for {1}").format(visit[fieldname], fieldname))
+
+		if visit["date_of_visit"]:
+			try:
+				visit["date_of_visit"] = getdate(visit["date_of_visit"])
+			except Exception:
+				messages.append(_("{0} is not a valid date").format(visit["date_of_visit"]))
+
+		for fieldname in CURRENCY_FIELDS:
+			visit[fieldname] = flt(visit[fieldname])
+
+		if visit["client_id"]:
+			if visit["client_id"] in client_ids:
+				messages.append(_("Client ID {0} is repeated in the batch").format(visit["client_id"]))
+			client_ids.add(visit["client_id"])
+
+		if messages:
+			errors.append({"row": idx, "error": "; ".join(messages)})
+		else:
+			valid.append((idx, visit))
+
+	return valid, errors
+
+
+def split_existing(valid):
+	"""Separate rows whose client_id was already saved by an earlier, possibly retried, request"""
+	client_ids = [visit["client_id"] for _idx, visit in valid if visit["client_id"]]
+	if not client_ids:
+		return valid, []
+
+	saved = dict(
+		frappe.get_all(
+			"Sales Visit Log",
+			filters={"client_id": ["in", client_ids]},
+			fields=["client_id", "name"],
+			as_list=True,
+		)
+	)
+
+	new = [(idx, visit) for idx, visit in valid if visit["client_id"] not in saved]
+	existing = [
+		{"row": idx, "client_id": visit["client_id"], "name": saved[visit["client_id"]]}
+		for idx, visit in valid
+		if visit["client_id"] in saved
+	]
+	return new, existing
+
+
+def insert_chunk(visits):
+	"""Write one chunk as submitted documents with a single multi-row INSERT"""
+	names = reserve_names(len(visits))
+	timestamp = now()
+	user = frappe.session.user
+
+	fields = ["name", "creation", "modified", "modified_by", "owner", "docstatus"]
+	fields.extend(VISIT_FIELDS)
+
+	values = [
+		(name, timestamp, timestamp, user, user, 1, *(visit[fieldname] for fieldname in VISIT_FIELDS))
+		for name, visit in zip(names, visits, strict=True)
+	]
+
+	frappe.db.bulk_insert("Sales Visit Log", fields, values, chunk_size=CHUNK_SIZE)
+	return names
+
+
+def reserve_names(count):
+	"""Take a block of consecutive names with one update of the naming series"""
+	current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", NAME_PREFIX)
+	if not current:
+		frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, 0)", NAME_PREFIX)
+		current = ((0,),)
+
+	start = current[0][0] + 1
+	frappe.db.sql("UPDATE `tabSeries` SET `current` = %s WHERE `name` = %s", (start + count - 1, NAME_PREFIX))
+
+	return [f"{NAME_PREFIX}{str(number).zfill(NAME_DIGITS)}" for number in range(start, start + count)]
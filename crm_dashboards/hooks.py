@@ -262,4 +262,65 @@ fixtures = [
             ["module", "in", ["Crm Dashboards"]]
         ]
     }
-]
\ No newline at end of file
+]
+
+doc_events = {
+    "Opportunity": {
+        "validate": "crm_dashboards.crm_dashboards.opportunity.set_lost_date",
+        "on_change": [
+            "crm_dashboards.crm_dashboards.opportunity.update_lost_date",
+            "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc"
+        ],
+        "on_trash": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc"
+    },
+    "Sales Invoice": {
+        "on_change": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc",
+        "on_trash": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc"
+    },
+    "Project": {
+        "on_change": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc",
+        "on_trash": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc"
+    },
+    "Customer": {
+        "on_change": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc",
+        "on_trash": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc"
+    },
+    "Sales Visit Log": {
+        "on_change": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc",
+        "on_trash": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc"
+    },
+    "Sales Person": {
+        "on_change": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc",
+        "on_trash": "crm_dashboards.crm_dashboards.report_cache.invalidate_for_doc"
+    },
+    "Stock Ledger Entry": {
+        "on_submit": "crm_dashboards.crm_dashboards.doctype.stock_movement_summary.stock_movement_summary.enqueue_summary_update"
+    }
+}
+
+scheduler_events = {
+    "cron": {
+        "*/5 * * * *": [
+            "crm_dashboards.crm_dashboards.report_cache.refresh_expiring"
+        ]
+    },
+    "daily": [
+        "crm_dashboards.crm_dashboards.doctype.opportunity_pipeline_snapshot.opportunity_pipeline_snapshot.take_snapshot",
+        "crm_dashboards.crm_dashboards.report_cache.precompute_date_windows",
+        "crm_dashboards.crm_dashboards.doctype.stock_movement_summary.stock_movement_summary.update_reposted_days"
+    ],
+    "hourly_long": [
+        "crm_dashboards.crm_dashboards.doctype.stock_ageing_state.stock_ageing_state.update_ageing_state"
+    ],
+    "daily_long": [
+        "crm_dashboards.crm_dashboards.rfm.update_rfm_scores"
+    ]
+}
+
+page_js = {
+    "dashboard-view": "public/js/dashboard_view.js"
+}
+
+default_log_clearing_doctypes = {
+    "Report Profile Log": 30
+}
@@ -0,0 +1,75 @@
+import json
+from collections import defaultdict
+
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_field
+from frappe.utils import getdate
+
+
+def execute():
+	# Fixtures are synced after patches, so make sure the column exists before backfilling
+	if not frappe.db.has_column("Opportunity", "lost_date"):
+		create_custom_field(
+			"Opportunity",
+			{
+				"fieldname": "lost_date",
+				"fieldtype": "Date",
+				"label": "Lost Date",
+				"insert_after": "order_lost_reason",
+				"read_only": 1,
+				"no_copy": 1,
+				"search_index": 1,
+			},
+		)
+
+	# Best available record of when the opportunity was lost: its latest version changing the
+	# status to Lost. The LIKE only narrows the candidates, each one's changes are checked below
+	versions = frappe.db.sql(
+		"""
+		SELECT version.docname, version.creation, version.data
+		FROM `tabVersion` version
+		INNER JOIN `tabOpportunity` opp ON opp.name = version.docname
+		WHERE version.ref_doctype = 'Opportunity'
+		AND version.data LIKE %s
+		AND opp.status = 'Lost'
+		AND opp.lost_date IS NULL
+		ORDER BY version.creation
+	""",
+		('%"Lost"%',),
+		as_dict=True,
+	)
+
+	lost_on = {}
+	for version in versions:
+		if is_lost_change(version.data):
+			lost_on[version.docname] = getdate(version.creation)
+
+	by_date = defaultdict(list)
+	for opportunity, lost_date in lost_on.items():
+		by_date[lost_date].append(opportunity)
+
+	for lost_date, opportunities in by_date.items():
+		frappe.db.sql(
+			"""
+			UPDATE `tabOpportunity`
+			SET lost_date = %(lost_date)s
+			WHERE name IN %(opportunities)s
+		""",
+			{"lost_date": lost_date, "opportunities": opportunities},
+		)
+
+	frappe.db.sql("""
+		UPDATE `tabOpportunity`
+		SET lost_date = DATE(modified)
+		WHERE status = 'Lost'
+		AND lost_date IS NULL
+	""")
+
+
+def is_lost_change(data):
+	try:
+		changed = json.loads(data or "{}").get("changed") or []
+	except (TypeError, ValueError, AttributeError):
+		return False
+
+	return any(len(change) == 3 and change[0] == "status" and change[2] == "Lost" for change in changed)
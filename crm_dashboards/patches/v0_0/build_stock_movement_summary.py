@@ -0,0 +1,8 @@
+from crm_dashboards.crm_dashboards.doctype.stock_movement_summary.stock_movement_summary import (
+	rebuild_summary,
+)
+
+
+def execute():
+	# Later days are kept up to date from Stock Ledger Entry submits
+	rebuild_summary()
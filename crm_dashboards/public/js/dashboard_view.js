@@ -0,0 +1,102 @@
+// Copyright (c) 2025, Meghwin Dave and contributors
+// For license information, please see license.txt
+
+// Serve the first paint of a dashboard from one batched request instead of one report run
+// per chart and one call per number card. Only the chart and number card loaders are served
+// from the batch; calls that are not in it, and every call after its first use, go to the
+// server as usual.
+(function() {
+	if (frappe._crm_dashboard_batch) {
+		return;
+	}
+
+	const BATCH_METHOD = "crm_dashboards.crm_dashboards.dashboard_batch.get_dashboard_payloads";
+	const batches = {};
+
+	const stable_stringify = function(value) {
+		if (typeof value === "string") {
+			try {
+				value = JSON.parse(value);
+			} catch (e) {
+				return JSON.stringify(value);
+			}
+		}
+
+		if (Array.isArray(value)) {
+			return "[" + value.map(stable_stringify).join(",") + "]";
+		}
+
+		if (value && typeof value === "object") {
+			return "{" + Object.keys(value).sort()
+				.filter((key) => value[key] !== undefined)
+				.map((key) => JSON.stringify(key) + ":" + stable_stringify(value[key]))
+				.join(",") + "}";
+		}
+
+		return JSON.stringify(value === undefined ? null : value);
+	};
+
+	const get_key = function(method, args) {
+		const key_args = {filters: (args && args.filters) || {}};
+		if (args && args.report_name) {
+			key_args.report_name = args.report_name;
+		}
+		return method + "|" + stable_stringify(key_args);
+	};
+
+	const get_batch = function(dashboard_name, xcall) {
+		if (!batches[dashboard_name]) {
+			batches[dashboard_name] = xcall(BATCH_METHOD, {dashboard_name: dashboard_name})
+				.then((payloads) => {
+					const results = {};
+					(payloads || []).forEach((payload) => {
+						results[get_key(payload.method, payload.args)] = payload.result;
+					});
+					return {results: results, methods: new Set((payloads || []).map((p) => p.method))};
+				})
+				.catch(() => ({results: {}, methods: new Set()}));
+		}
+		return batches[dashboard_name];
+	};
+
+	const batched_xcall = function(xcall, method, args, ...rest) {
+		const route = frappe.get_route();
+		if (route[0] !== "dashboard-view" || !route[1]) {
+			return xcall(method, args, ...rest);
+		}
+
+		return get_batch(route[1], xcall).then((batch) => {
+			const key = get_key(method, args);
+			if (batch.methods.has(method) && key in batch.results) {
+				const result = batch.results[key];
+				delete batch.results[key];
+				return result;
+			}
+			return xcall(method, args, ...rest);
+		});
+	};
+
+	// Only the call a widget loader makes while it runs is routed through the batch; the
+	// loaders call frappe.xcall synchronously, so nothing else can run in between
+	const wrap_loader = function(widget_class, loader) {
+		const original_loader = widget_class && widget_class.prototype[loader];
+		if (!original_loader) {
+			return;
+		}
+
+		widget_class.prototype[loader] = function(...loader_args) {
+			const xcall = frappe.xcall;
+			frappe.xcall = (method, args, ...rest) => batched_xcall(xcall, method, args, ...rest);
+			try {
+				return original_loader.apply(this, loader_args);
+			} finally {
+				frappe.xcall = xcall;
+			}
+		};
+	};
+
+	const widgets = (frappe.widget && frappe.widget.widget_factory) || {};
+	frappe._crm_dashboard_batch = true;
+	wrap_loader(widgets.chart, "fetch");
+	wrap_loader(widgets.number_card, "get_number");
+})();